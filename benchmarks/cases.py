@@ -0,0 +1,344 @@
+import numpy as np
+import scipy.interpolate as si
+from scipy.spatial import cKDTree
+
+from feleves_feladat.core import backends
+from feleves_feladat.core.barycentric import chebyshev_nodes, node_weights
+from feleves_feladat.core.bspline_approximator import BSplineApproximator
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.core.intersection import intersect_curves
+from feleves_feladat.core.projection import CurveProjector
+
+BSPLINE_COUNTS = (8, 32, 128)
+BSPLINE_ORDERS = (3, 4, 6)
+SAMPLE_COUNTS = (200, 2000)
+INTERSECTION_BATCH = 16
+BEZIER_COUNTS = (4, 8, 16)
+KERNEL_BATCHES = (16, 256)
+
+QUICK_BSPLINE_COUNTS = (8, 32)
+QUICK_BSPLINE_ORDERS = (4,)
+QUICK_SAMPLE_COUNTS = (200,)
+QUICK_BEZIER_COUNTS = (4, 8)
+QUICK_KERNEL_BATCHES = (16,)
+
+
+class Case:
+    # `run` is the timed call; `check` returns the largest absolute deviation
+    # from the SciPy reference (for the kernel cases, from the NumPy backend),
+    # or None when there is nothing to compare.
+    def __init__(self, name, params, run, samples, check=None):
+        self.name = name
+        self.params = params
+        self.run = run
+        self.samples = samples
+        self.check = check
+
+    @property
+    def id(self):
+        return self.name + '[' + ','.join(f'{key}={value}' for key, value in self.params.items()) + ']'
+
+
+def control_polygon(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(100, 700, n)
+    y = 300 + rng.uniform(-200, 200, n)
+    return np.column_stack([x, y])
+
+
+def scipy_bspline(ctrl, k, t_values, knots):
+    return si.BSpline(knots, ctrl, k - 1, extrapolate=False)(t_values)
+
+
+def bezier_knots(n):
+    return np.concatenate([np.zeros(n), np.ones(n)])
+
+
+def max_deviation(result, reference):
+    result = np.asarray(result, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    if result.shape != reference.shape:
+        return float('inf')
+    return float(np.max(np.abs(result - reference))) if result.size else 0.0
+
+
+def compute_bspline_cases(counts, orders, sample_counts):
+    for n in counts:
+        for k in orders:
+            for samples in sample_counts:
+                ctrl = control_polygon(n)
+                for cache in ('warm', 'cold'):
+                    if cache == 'warm':
+                        calculator = BSplineCalculator()
+                        run = lambda ctrl=ctrl, k=k, samples=samples, calculator=calculator: \
+                            calculator.compute_bspline(ctrl, k, samples)
+                    else:
+                        run = lambda ctrl=ctrl, k=k, samples=samples: \
+                            BSplineCalculator().compute_bspline(ctrl, k, samples)
+
+                    def check(ctrl=ctrl, k=k, samples=samples):
+                        knots, t_values = BSplineCalculator.uniform_parameters(len(ctrl), k, samples)
+                        return max_deviation(BSplineCalculator().compute_bspline(ctrl, k, samples),
+                                             scipy_bspline(ctrl, k, t_values, knots))
+
+                    yield Case('compute_bspline', {'n': n, 'k': k, 'samples': samples, 'cache': cache},
+                               run, samples, check)
+
+
+def tessellate_cases(counts, orders):
+    # Adaptive flattening through the Bezier extraction; the sample count
+    # is whatever the tolerance needs, so throughput is not comparable.
+    for n in counts:
+        for k in orders:
+            ctrl = control_polygon(n)
+            calculator = BSplineCalculator()
+            yield Case('BSplineCalculator.tessellate', {'n': n, 'k': k},
+                       lambda ctrl=ctrl, k=k, calculator=calculator: calculator.tessellate(ctrl, k), None)
+
+
+def least_squares_cases(counts, orders, sample_counts):
+    for n in counts:
+        for k in orders:
+            if k < 3:
+                continue
+            target_k = k - 1
+            for samples in sample_counts:
+                ctrl = control_polygon(n)
+                for cache in ('warm', 'cold'):
+                    if cache == 'warm':
+                        approximator = BSplineApproximator(BSplineCalculator())
+                        run = lambda ctrl=ctrl, k=k, samples=samples, approximator=approximator: \
+                            approximator.least_squares_approximation(ctrl, k, k - 1, num_sample_points=samples)
+                    else:
+                        run = lambda ctrl=ctrl, k=k, samples=samples: \
+                            BSplineApproximator(BSplineCalculator()).least_squares_approximation(
+                                ctrl, k, k - 1, num_sample_points=samples)
+
+                    def check(ctrl=ctrl, k=k, target_k=target_k, samples=samples):
+                        # Compare the fitted curves rather than the control
+                        # points, which are not unique when B is rank deficient.
+                        new_ctrl, _, _ = BSplineApproximator(BSplineCalculator()).least_squares_approximation(
+                            ctrl, k, target_k, num_sample_points=samples)
+                        knots, t_values = BSplineCalculator.uniform_parameters(len(ctrl), k, samples)
+                        target = scipy_bspline(ctrl, k, t_values, knots)
+                        approx_knots = np.linspace(0, 1, len(ctrl) + target_k)
+                        B = si.BSpline.design_matrix(t_values, approx_knots, target_k - 1).toarray()
+                        reference_ctrl = np.linalg.lstsq(B, target, rcond=None)[0]
+                        return max_deviation(B @ new_ctrl, B @ reference_ctrl)
+
+                    yield Case('least_squares_approximation',
+                               {'n': n, 'k': k, 'target_k': target_k, 'samples': samples, 'cache': cache},
+                               run, samples, check)
+
+
+def projection_cases(counts, orders, sample_counts):
+    # Closest points on one curve for the samples of another. Every dense
+    # sample is a point of the curve, so the nearest one bounds the true
+    # distance from above; the check reports how far a result exceeds it.
+    for n in counts:
+        for k in orders:
+            for samples in sample_counts:
+                ctrl = control_polygon(n)
+                calculator = BSplineCalculator()
+                projector = CurveProjector(ctrl, k, calculator=calculator)
+                queries = calculator.compute_bspline(control_polygon(n, seed=1), k, samples)
+
+                def check(ctrl=ctrl, k=k, projector=projector, queries=queries):
+                    knots, t_values = BSplineCalculator.uniform_parameters(len(ctrl), k, 100000)
+                    upper = cKDTree(scipy_bspline(ctrl, k, t_values, knots)).query(queries)[0]
+                    return float(np.max(np.maximum(projector.project(queries)[2] - upper, 0.0)))
+
+                yield Case('CurveProjector.project', {'n': n, 'k': k, 'samples': samples},
+                           lambda projector=projector, queries=queries: projector.project(queries), samples, check)
+
+
+def intersection_cases(counts, orders, batch=INTERSECTION_BATCH):
+    # Crossings of `batch` random splines with their lower-order least
+    # squares fits; throughput is curve pairs per second. The check is the
+    # largest gap |A(s) - B(t)| at a reported crossing.
+    for n in counts:
+        for k in orders:
+            if k < 3:
+                continue
+            calculator = BSplineCalculator()
+            approximator = BSplineApproximator(calculator)
+            pairs = []
+            for seed in range(batch):
+                ctrl = control_polygon(n, seed)
+                new_ctrl = approximator.least_squares_approximation(ctrl, k, k - 1, max(k - 1, n // 2))[0]
+                pairs.append((CurveProjector(ctrl, k, calculator=calculator),
+                              CurveProjector(new_ctrl, k - 1, calculator=calculator)))
+
+            def run(pairs=pairs):
+                return [intersect_curves(first, second) for first, second in pairs]
+
+            def check(pairs=pairs):
+                gaps = [np.linalg.norm(first.evaluate(params[:, 0])[0] - second.evaluate(params[:, 1])[0], axis=1)
+                        for (first, second), (params, _) in zip(pairs, run(pairs))]
+                return float(max((gap.max() for gap in gaps if len(gap)), default=0.0))
+
+            yield Case('intersect_curves', {'n': n, 'k': k, 'target_k': k - 1, 'batch': batch}, run, batch, check)
+
+
+def approximation_by_order_cases(counts, orders, sample_counts):
+    for n in counts:
+        for k in orders:
+            if k < 3:
+                continue
+            approx_k = k - 1
+            for samples in sample_counts:
+                ctrl = control_polygon(n)
+                approximator = BSplineApproximator(BSplineCalculator())
+                shifted = ctrl.copy()
+
+                def run(ctrl=ctrl, shifted=shifted, k=k, samples=samples, approximator=approximator):
+                    # Alternates one moved point, as a drag does in the app.
+                    middle = len(ctrl) // 2
+                    moved = shifted[middle, 1] != ctrl[middle, 1]
+                    shifted[middle, 1] = ctrl[middle, 1] + (0.0 if moved else 1.0)
+                    return approximator.compute_approximation_by_order(shifted, k, k - 1, samples)
+
+                def check(ctrl=ctrl, k=k, approx_k=approx_k, samples=samples):
+                    approx_curve, _, _, _ = BSplineApproximator(BSplineCalculator()).compute_approximation_by_order(
+                        ctrl, k, approx_k, samples)
+                    _, t_values = BSplineCalculator.uniform_parameters(len(ctrl), k, samples)
+                    approx_knots = np.linspace(0, 1, len(ctrl) + approx_k)
+                    return max_deviation(approx_curve, scipy_bspline(ctrl, approx_k, t_values, approx_knots))
+
+                yield Case('compute_approximation_by_order',
+                           {'n': n, 'k': k, 'approx_k': approx_k, 'samples': samples},
+                           run, samples, check)
+
+
+def de_casteljau_cases(counts, sample_counts):
+    from de_casteljau import DeCasteljau
+    from feleves_feladat.core.bezier import de_casteljau_points
+
+    for n in counts:
+        ctrl = control_polygon(n)
+        curve = DeCasteljau()
+        curve._points = ControlPointStore(ctrl)
+
+        def check_construction(curve=curve, ctrl=ctrl):
+            point, _ = curve.de_casteljau(0.3)
+            return max_deviation(point, si.BSpline(bezier_knots(len(ctrl)), ctrl, len(ctrl) - 1)(0.3))
+
+        yield Case('DeCasteljau.de_casteljau', {'n': n}, lambda curve=curve: curve.de_casteljau(0.3), 1,
+                   check_construction)
+
+        for samples in sample_counts:
+            t_values = np.linspace(0, 1, samples)
+
+            def check(ctrl=ctrl, t_values=t_values):
+                return max_deviation(de_casteljau_points(ctrl, t_values),
+                                     si.BSpline(bezier_knots(len(ctrl)), ctrl, len(ctrl) - 1)(t_values))
+
+            yield Case('de_casteljau_points', {'n': n, 'samples': samples},
+                       lambda ctrl=ctrl, t_values=t_values: de_casteljau_points(ctrl, t_values), samples, check)
+
+
+def rational_bezier_cases(counts, sample_counts):
+    from rac_bezier import BezierCurve
+
+    for n in counts:
+        ctrl = control_polygon(n)
+        weights = np.linspace(1, 3, n)
+        curve = BezierCurve()
+        curve._points = ControlPointStore(ctrl)
+        curve.weights = weights
+        for samples in sample_counts:
+            t_values = np.linspace(0, 1, samples)
+
+            def check(curve=curve, ctrl=ctrl, weights=weights, t_values=t_values):
+                homogeneous = si.BSpline(bezier_knots(len(ctrl)), np.column_stack([ctrl * weights[:, None], weights]),
+                                         len(ctrl) - 1)(t_values)
+                return max_deviation(curve.bezier(t_values), homogeneous[:, :2] / homogeneous[:, 2:])
+
+            yield Case('BezierCurve.bezier', {'n': n, 'samples': samples},
+                       lambda curve=curve, t_values=t_values: curve.bezier(t_values), samples, check)
+
+
+def lagrange_cases(counts, sample_counts):
+    from lagrange import LagrangeInterpolation
+
+    for n in counts:
+        ctrl = control_polygon(n)
+        curve = LagrangeInterpolation()
+        curve._points = ControlPointStore(ctrl)
+        for samples in sample_counts:
+            t_values = np.linspace(0, 1, samples)
+
+            def check(curve=curve, ctrl=ctrl, t_values=t_values):
+                reference = si.BarycentricInterpolator(np.linspace(0, 1, len(ctrl)), ctrl)(t_values)
+                return max_deviation(curve.lagrange_interpolation(t_values), reference)
+
+            yield Case('LagrangeInterpolation.lagrange_interpolation', {'n': n, 'samples': samples},
+                       lambda curve=curve, t_values=t_values: curve.lagrange_interpolation(t_values), samples, check)
+
+
+def kernel_cases(backend, orders, bezier_counts, batches):
+    # The backend kernels called directly at small batch sizes, where the
+    # per-call overhead dominates, each checked against the NumPy reference.
+    # A backend whose dependency is missing raises ImportError here.
+    module = backends.load_backend(backend)
+    reference = backends.load_backend(backends.REFERENCE)
+    rng = np.random.default_rng(0)
+    for batch in batches:
+        t_values = np.sort(rng.random(batch))
+        calls = []
+        for k in orders:
+            knots = np.linspace(0, 1, 32 + k)
+            calls.append(('nonzero_basis', {'k': k}, (k, t_values, knots)))
+        calls.append(('find_spans', {}, (t_values, np.linspace(0, 1, 36))))
+        for n in bezier_counts:
+            ctrl = control_polygon(n)
+            calls.append(('de_casteljau_points', {'n': n}, (ctrl, t_values)))
+            calls.append(('bernstein_matrix', {'n': n}, (n - 1, t_values)))
+            nodes = chebyshev_nodes(n)
+            calls.append(('barycentric_evaluate', {'n': n}, (nodes, node_weights(nodes), ctrl, t_values)))
+        for kernel, params, args in calls:
+            run = getattr(module, kernel)
+
+            def check(run=run, expected=getattr(reference, kernel), args=args):
+                result, reference_result = run(*args), expected(*args)
+                if isinstance(result, tuple):
+                    if not np.array_equal(result[0], reference_result[0]):
+                        return float('inf')
+                    result, reference_result = result[1], reference_result[1]
+                return max_deviation(result, reference_result)
+
+            yield Case('kernel.' + kernel, {'backend': backend, **params, 'samples': batch},
+                       lambda run=run, args=args: run(*args), batch, check)
+
+
+def all_cases(quick=False):
+    # The pygame scripts are imported lazily; without pygame their cases are
+    # reported as skipped and the core benchmarks still run.
+    counts = QUICK_BSPLINE_COUNTS if quick else BSPLINE_COUNTS
+    orders = QUICK_BSPLINE_ORDERS if quick else BSPLINE_ORDERS
+    sample_counts = QUICK_SAMPLE_COUNTS if quick else SAMPLE_COUNTS
+    bezier_counts = QUICK_BEZIER_COUNTS if quick else BEZIER_COUNTS
+    kernel_batches = QUICK_KERNEL_BATCHES if quick else KERNEL_BATCHES
+
+    groups = [
+        ('compute_bspline', lambda: compute_bspline_cases(counts, orders, sample_counts)),
+        ('tessellate', lambda: tessellate_cases(counts, orders)),
+        ('least_squares_approximation', lambda: least_squares_cases(counts, orders, sample_counts)),
+        ('CurveProjector', lambda: projection_cases(counts, orders, sample_counts)),
+        ('intersect_curves', lambda: intersection_cases(counts, orders)),
+        ('compute_approximation_by_order', lambda: approximation_by_order_cases(counts, orders, sample_counts)),
+        ('DeCasteljau', lambda: de_casteljau_cases(bezier_counts, sample_counts)),
+        ('BezierCurve', lambda: rational_bezier_cases(bezier_counts, sample_counts)),
+        ('LagrangeInterpolation', lambda: lagrange_cases(bezier_counts, sample_counts)),
+    ]
+    groups += [(f'kernels[{backend}]', lambda backend=backend: kernel_cases(backend, orders, bezier_counts,
+                                                                             kernel_batches))
+               for backend in backends.AUTO_ORDER]
+    cases, skipped = [], []
+    for name, make in groups:
+        try:
+            cases.extend(make())
+        except ImportError as error:
+            skipped.append({'group': name, 'reason': str(error)})
+    return cases, skipped
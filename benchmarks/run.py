@@ -0,0 +1,173 @@
+import os
+
+# Must be set before pygame is imported by any of the curve scripts.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from feleves_feladat.core import backends
+
+from .cases import all_cases
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_THRESHOLD = 1.25
+ACCURACY_TOLERANCE = 1e-8
+
+
+def time_case(case, min_time=0.2, repeats=5):
+    # Calibrates a loop count so one repeat takes about min_time / repeats,
+    # then reports the median time per call over the repeats.
+    case.run()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / repeats / elapsed) + 1)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.run()
+        timings.append((time.perf_counter() - start) / loops)
+    return float(np.median(timings)), float(np.min(timings))
+
+
+def peak_memory(case):
+    tracemalloc.start()
+    try:
+        case.run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_cases(cases, min_time=0.2, repeats=5, log=None):
+    results = []
+    for case in cases:
+        median_s, best_s = time_case(case, min_time, repeats)
+        error = case.check() if case.check is not None else None
+        result = {
+            'id': case.id,
+            'name': case.name,
+            'params': case.params,
+            'median_s': median_s,
+            'best_s': best_s,
+            'samples_per_s': case.samples / median_s if case.samples and median_s > 0 else None,
+            'peak_bytes': peak_memory(case),
+            'max_abs_error': error,
+        }
+        results.append(result)
+        if log is not None:
+            log(format_result(result))
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'processor': platform.processor(),
+        'backend': backends.backend_name(),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, tolerance=ACCURACY_TOLERANCE):
+    # A case regresses when its median time grows by more than `threshold`
+    # times the baseline, or when it drifts away from the SciPy reference.
+    previous = {result['id']: result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        error = result['max_abs_error']
+        if error is not None and not error <= tolerance:
+            regressions.append({'id': result['id'], 'kind': 'accuracy', 'max_abs_error': error})
+        old = previous.get(result['id'])
+        if old is None or not old['median_s']:
+            continue
+        ratio = result['median_s'] / old['median_s']
+        if ratio > threshold:
+            regressions.append({'id': result['id'], 'kind': 'time', 'ratio': ratio,
+                                'median_s': result['median_s'], 'baseline_s': old['median_s']})
+    return regressions
+
+
+def format_result(result):
+    error = result['max_abs_error']
+    error_text = '-' if error is None else f'{error:.1e}'
+    rate = result['samples_per_s']
+    if rate is None:
+        rate_text = '-'
+    elif rate >= 1e4:
+        rate_text = f'{rate / 1e6:8.2f} M/s'
+    else:
+        rate_text = f'{rate:8.1f} /s '
+    return (f"{result['id']:<80} {result['median_s'] * 1e6:10.1f} us  {rate_text}  "
+            f"{result['peak_bytes'] / 1024:8.1f} KiB  err {error_text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless benchmarks for the curve algorithms.')
+    parser.add_argument('--quick', action='store_true', help='run a reduced parameter grid')
+    parser.add_argument('--filter', default='', help='only run cases whose id contains this text')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent timing each case')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with these results')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='flag cases slower than threshold * baseline')
+    parser.add_argument('--backend', default='auto',
+                        help="compute backend for the library calls: auto, numpy or numba")
+    args = parser.parse_args(argv)
+    try:
+        backends.set_backend(args.backend)
+    except (ImportError, ValueError) as error:
+        parser.error(f'backend {args.backend!r} is not usable: {error}')
+
+    cases, skipped = all_cases(args.quick)
+    cases = [case for case in cases if args.filter in case.id]
+    for group in skipped:
+        print(f"skipped {group['group']}: {group['reason']}")
+
+    results = run_cases(cases, args.min_time, args.repeats, log=print)
+    report = {'environment': environment(), 'skipped': skipped, 'results': results}
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report['regressions'] = regressions
+        for regression in regressions:
+            if regression['kind'] == 'time':
+                print(f"REGRESSION {regression['id']}: {regression['ratio']:.2f}x slower than baseline")
+            else:
+                print(f"REGRESSION {regression['id']}: error {regression['max_abs_error']:.1e} vs SciPy")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'baseline written to {args.baseline}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+# Each statement runs in a fresh interpreter; the reported time is the
+# wall-clock time of the process minus that of an empty interpreter.
+STATEMENTS = {
+    'core': 'import feleves_feladat.core',
+    'bspline_calculator': 'from feleves_feladat.core.bspline_calculator import BSplineCalculator',
+    'bspline_approximator': 'from feleves_feladat.core.bspline_approximator import BSplineApproximator',
+    'batch': 'import feleves_feladat.core.batch',
+    'backend': 'from feleves_feladat.core import backends; backends.get_backend()',
+    'numpy': 'import numpy',
+    'pygame': 'import pygame',
+}
+
+PROBE = "import sys, time; t = time.perf_counter(); {statement}; elapsed = time.perf_counter() - t; " \
+        "print(elapsed, 'pygame' in sys.modules, 'scipy' in sys.modules, 'numba' in sys.modules)"
+
+
+def measure(statement, repeats=5):
+    timings, modules = [], None
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement)],
+                                capture_output=True, text=True, check=True,
+                                env={'PYGAME_HIDE_SUPPORT_PROMPT': '1'}).stdout.split()
+        timings.append(float(output[0]))
+        modules = {'pygame': output[1] == 'True', 'scipy': output[2] == 'True', 'numba': output[3] == 'True'}
+    return float(np.median(timings)), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import time of the numerical core in a fresh interpreter.')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, statement in STATEMENTS.items():
+        try:
+            seconds, modules = measure(statement, args.repeats)
+        except subprocess.CalledProcessError:
+            print(f'{name:<22} unavailable')
+            continue
+        results[name] = {'import_s': seconds, 'loads': modules}
+        loaded = ', '.join(module for module, present in modules.items() if present) or '-'
+        print(f'{name:<22} {seconds * 1000:8.1f} ms   loads: {loaded}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    # Importing the core must load neither the display library nor the JIT
+    # compiler; the compute backend is only chosen when a kernel first runs.
+    core_leaks = [name for name in ('core', 'bspline_calculator', 'bspline_approximator', 'batch')
+                  if any(results.get(name, {}).get('loads', {}).get(module) for module in ('pygame', 'numba'))]
+    return 1 if core_leaks else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
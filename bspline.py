@@ -1,66 +1,41 @@
 import pygame
 import sys
-import scipy.interpolate as si
 import numpy as np
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.ui import renderer
 
 
 class BSplineInterpolation:
     def __init__(self):
-        self._points = [
-            {'x': 100 + i * 100, 'y': 300 if i % 2 == 0 else 100} for i in range(8)
-        ]
+        self._points = ControlPointStore([(100 + i * 100, 300 if i % 2 == 0 else 100) for i in range(8)])
         self.selected_point = None
         self.k = 4
+        self.calculator = BSplineCalculator()
 
     def basis_function(self, i, k, t, knots):
-        if k == 1:
-            return 1.0 if knots[i] <= t < knots[i + 1] else 0.0
-        else:
-            denom1 = knots[i + k - 1] - knots[i]
-            term1 = 0.0 if denom1 == 0 else (t - knots[i]) / denom1 * self.basis_function(i, k - 1, t, knots)
-            denom2 = knots[i + k] - knots[i + 1]
-            term2 = 0.0 if denom2 == 0 else (knots[i + k] - t) / denom2 * self.basis_function(i + 1, k - 1, t, knots)
-            return term1 + term2
+        return BSplineCalculator.basis_function(i, k, t, knots)
 
     def compute_bspline(self, num_points=100):
         n = len(self._points)
         knots = np.linspace(0, 1, n + self.k)
         t_values = np.linspace(knots[self.k - 1], knots[n], num_points)
-        spline_x, spline_y = [], []
-
-        for t in t_values:
-            x, y = 0.0, 0.0
-            for i in range(n):
-                basis = self.basis_function(i, self.k, t, knots)
-                x += basis * self._points[i]['x']
-                y += basis * self._points[i]['y']
-            spline_x.append(x)
-            spline_y.append(y)
-
-        return [{'x': spline_x[i], 'y': spline_y[i]} for i in range(len(spline_x))]
+        return self.calculator.evaluate(self._points.array, self.k, t_values, knots)
 
     def find_point(self, x, y):
-        for point in self._points:
-            if ((point['x'] - x) ** 2 + (point['y'] - y) ** 2) ** 0.5 < 10:
-                return point
-        return None
+        return self._points.find(x, y)
 
     def add_point(self, x, y):
-        self._points.append({'x': x, 'y': y})
-        self._points.sort(key=lambda p: p['x'])
+        self._points.append(x, y)
+        self._points.sort_by_x()
 
     def draw(self, screen):
         screen.fill((255, 255, 255))
 
-        for point in self._points:
-            pygame.draw.circle(screen, (0, 0, 255), (int(point['x']), int(point['y'])), 5)
+        renderer.draw_points(screen, (0, 0, 255), self._points.array, 5)
 
-        curve_points = self.compute_bspline()
-        if curve_points:
-            for i in range(len(curve_points) - 1):
-                pygame.draw.line(screen, (255, 0, 0),
-                                 (int(curve_points[i]['x']), int(curve_points[i]['y'])),
-                                 (int(curve_points[i + 1]['x']), int(curve_points[i + 1]['y'])), 2)
+        _, curve_points = self.calculator.tessellate(self._points.array, self.k)
+        renderer.draw_polyline(screen, (255, 0, 0), curve_points, 2)
 
     def run(self):
         pygame.init()
@@ -79,8 +54,8 @@ class BSplineInterpolation:
                         self.add_point(*event.pos)
                 elif event.type == pygame.MOUSEBUTTONUP:
                     self.selected_point = None
-                elif event.type == pygame.MOUSEMOTION and self.selected_point:
-                    self.selected_point['x'], self.selected_point['y'] = event.pos
+                elif event.type == pygame.MOUSEMOTION and self.selected_point is not None:
+                    self._points.set(self.selected_point, *event.pos)
 
             self.draw(screen)
             pygame.display.flip()
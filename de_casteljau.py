@@ -1,59 +1,59 @@
 import pygame
-import numpy as np
 import sys
+import numpy as np
+from feleves_feladat.core.bezier import de_casteljau
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.core.spatial_index import SegmentBVH
+from feleves_feladat.ui import renderer
+from feleves_feladat.core.tessellation import flatten_bezier
 
 
 class DeCasteljau:
     def __init__(self):
-        self._points = [
-            [100.0, 300.0],
-            [300.0, 100.0],
-            [500.0, 300.0]
-        ]
+        self._points = ControlPointStore([
+            (100.0, 300.0),
+            (300.0, 100.0),
+            (500.0, 300.0)
+        ])
         self.selected_point = None
         self.t_value = 0.5
+        self._bvh = SegmentBVH()
 
     def de_casteljau(self, t):
+        points, pyramids = de_casteljau(self._points.array, [t], pyramid_indices=[0])
+        return tuple(points[0]), pyramids[0]
 
-        points = np.array(self._points, dtype=float).copy()
-        n = len(points)
-        intermediate_steps = []
-
-        for r in range(1, n):
-            new_points = []
-            for i in range(n - r):
-                points[i] = (1 - t) * points[i] + t * points[i + 1]
-                new_points.append(points[i].copy())
-            intermediate_steps.append(new_points)
-        return tuple(points[0]), intermediate_steps
+    def tessellate(self):
+        return flatten_bezier(self._points.array[None], breakpoints=[0.0, 1.0])
 
     def find_point(self, x, y):
-        for point in self._points:
-            if ((point[0] - x) ** 2 + (point[1] - y) ** 2) ** 0.5 < 10:
-                return point
-        return None
+        return self._points.find(x, y)
+
+    def curve_bvh(self):
+        t_values, curve_points = self.tessellate()
+        self._bvh.update(curve_points, t_values)
+        return self._bvh
+
+    def add_point(self, x, y, radius=8):
+        # A click on the curve inserts a control point where the curve
+        # passes: control point i belongs to t = i / degree.
+        location = self.curve_bvh().nearest(x, y, radius)
+        if location is None:
+            return None
+        n = len(self._points)
+        index = int(np.clip(np.searchsorted(np.linspace(0, 1, n), location[1]), 1, n - 1))
+        return self._points.insert(index, float(x), float(y))
 
     def draw(self, screen):
         screen.fill((255, 255, 255))
 
-        for point in self._points:
-            pygame.draw.circle(screen, (0, 0, 255), (int(point[0]), int(point[1])), 5)
-
-        curve_points = []
-        all_intermediate_steps = []
-        for t in np.linspace(0, 1, 101):
-            bezier_point, intermediate_step = self.de_casteljau(self.t_value)
-            bezier_point, intermediate_steps = self.de_casteljau(t)
-            curve_points.append(bezier_point)
-            all_intermediate_steps.append(intermediate_step)
+        renderer.draw_points(screen, (0, 0, 255), self._points.array, 5)
 
-        for i in range(len(curve_points) - 1):
-            pygame.draw.line(screen, (255, 0, 0), curve_points[i], curve_points[i + 1], 2)
+        _, curve_points = self.tessellate()
+        _, intermediate_steps = self.de_casteljau(self.t_value)
 
-        for step in all_intermediate_steps:
-            for line_points in step:
-                for i in range(len(line_points) - 1):
-                    pygame.draw.line(screen, (0, 255, 0), line_points[i], line_points[i + 1], 1)
+        renderer.draw_polyline(screen, (255, 0, 0), curve_points, 2)
+        renderer.draw_polylines(screen, (0, 255, 0), intermediate_steps, 1)
 
 
         pygame.draw.rect(screen, (200, 200, 200), (100, 550, 600, 10))
@@ -70,7 +70,9 @@ class DeCasteljau:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if 100 <= event.pos[0] <= 700 and 545 <= event.pos[1] <= 565:
+                    if event.button == 3:
+                        self.add_point(*event.pos)
+                    elif 100 <= event.pos[0] <= 700 and 545 <= event.pos[1] <= 565:
                         self.t_value = (event.pos[0] - 100) / 600
                     else:
                         self.selected_point = self.find_point(*event.pos)
@@ -80,8 +82,8 @@ class DeCasteljau:
                     if pygame.mouse.get_pressed()[0]:
                         if 100 <= event.pos[0] <= 700:
                             self.t_value = (event.pos[0] - 100) / 600
-                        elif self.selected_point:
-                            self.selected_point[0], self.selected_point[1] = float(event.pos[0]), float(event.pos[1])
+                        elif self.selected_point is not None:
+                            self._points.set(self.selected_point, float(event.pos[0]), float(event.pos[1]))
 
             self.draw(screen)
             pygame.display.flip()
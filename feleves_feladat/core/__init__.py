@@ -0,0 +1,28 @@
+import importlib
+
+# The public classes are imported on first access, so importing the package
+# only loads the modules that are actually used; nothing here depends on a
+# display library.
+_EXPORTS = {
+    'BSplineCalculator': 'bspline_calculator',
+    'BSplineApproximator': 'bspline_approximator',
+    'IncrementalBSpline': 'incremental',
+    'ControlPointStore': 'control_points',
+    'BasisCache': 'basis_cache',
+    'BarycentricInterpolator': 'barycentric',
+    'FrameProfiler': 'profiling',
+    'CurveProjector': 'projection',
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def pointwise_errors(reference, approximation):
+    diff = np.subtract(reference, approximation, dtype=float)
+    if diff.ndim == 1:
+        diff = diff[:, None]
+    elif diff.ndim > 2:
+        diff = diff.reshape(diff.shape[0], -1)
+    if diff.shape[1] == 0:
+        return np.zeros(len(diff))
+    # Column by column: much faster than a reduction over a length-2 axis.
+    squared = diff[:, 0] ** 2
+    for d in range(1, diff.shape[1]):
+        squared += diff[:, d] ** 2
+    return np.sqrt(squared, out=squared)
+
+
+def summarize(errors, percentiles=(50, 90, 99)):
+    errors = np.asarray(errors, dtype=float)
+    if errors.size == 0:
+        summary = {'max': 0.0, 'rms': 0.0, 'mean': 0.0}
+        summary.update({f'p{p}': 0.0 for p in percentiles})
+        return summary
+    summary = {
+        'max': float(errors.max()),
+        'rms': float(np.sqrt(np.mean(errors ** 2))),
+        'mean': float(errors.mean()),
+    }
+    if percentiles:
+        summary.update({f'p{p}': float(v) for p, v in zip(percentiles, np.percentile(errors, percentiles))})
+    return summary
+
+
+def normalized(errors):
+    errors = np.asarray(errors, dtype=float)
+    max_e = errors.max() if errors.size else 1.0
+    if max_e == 0:
+        max_e = 1.0
+    return np.clip(errors / max_e, 0.0, 1.0)
+
+
+def segment_colors(errors, levels=None):
+    # Green (small error) to red (largest error), one RGB row per segment,
+    # colored by the error at the segment's first sample. With `levels` the
+    # ramp is quantized, which lets the renderer batch equal-colored runs.
+    value = normalized(errors)[:-1]
+    if levels:
+        value = np.round(value * (levels - 1)) / (levels - 1)
+    colors = np.zeros((len(value), 3), dtype=np.uint8)
+    colors[:, 0] = (255 * value).astype(np.uint8)
+    colors[:, 1] = (255 * (1 - value)).astype(np.uint8)
+    return colors
@@ -0,0 +1,154 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .bspline_approximator import BSplineApproximator
+from .bspline_calculator import BSplineCalculator
+
+Candidate = namedtuple('Candidate', ['target_k', 'num_ctrl', 'max_error', 'rms_error'])
+
+_worker_approximator = None
+
+
+def _approximator():
+    # One approximator per process, so its basis cache and normal-matrix
+    # factors are reused by every fit that process runs.
+    global _worker_approximator
+    if _worker_approximator is None:
+        _worker_approximator = BSplineApproximator(BSplineCalculator())
+    return _worker_approximator
+
+
+def fit_candidate(points, original_k, target_k, num_ctrl, num_sample_points=400):
+    new_ctrl, max_error, rms_error = _approximator().least_squares_approximation(
+        points, original_k, target_k, num_target_ctrl_points=num_ctrl, num_sample_points=num_sample_points)
+    if len(new_ctrl) == 0:
+        return Candidate(target_k, num_ctrl, np.inf, np.inf)
+    return Candidate(target_k, num_ctrl, max_error, rms_error)
+
+
+def _fit_task(args):
+    return fit_candidate(*args)
+
+
+def _map(function, tasks, workers):
+    # workers=1 runs in this process; otherwise the tasks are spread over a
+    # process pool (all cores when workers is None).
+    tasks = list(tasks)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    workers = min(workers, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+def default_orders(original_k):
+    return range(2, original_k + 1)
+
+
+def default_max_ctrl(num_points, num_sample_points=400):
+    return max(2, min(4 * num_points, num_sample_points // 2))
+
+
+def sweep(points, original_k, target_orders=None, ctrl_counts=None, num_sample_points=400, workers=None):
+    # Fits every (target_k, control count) pair; pairs with fewer control
+    # points than the order are skipped.
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if target_orders is None:
+        target_orders = default_orders(original_k)
+    if ctrl_counts is None:
+        ctrl_counts = range(2, default_max_ctrl(len(points), num_sample_points) + 1)
+    tasks = [(points, original_k, target_k, num_ctrl, num_sample_points)
+             for target_k in target_orders for num_ctrl in ctrl_counts if num_ctrl >= target_k]
+    return _map(_fit_task, tasks, workers)
+
+
+def pareto_front(candidates):
+    # Candidates not dominated in (num_ctrl, max_error, rms_error), sorted by
+    # control point count.
+    finite = sorted((c for c in candidates if np.isfinite(c.max_error)),
+                    key=lambda c: (c.num_ctrl, c.max_error, c.rms_error))
+    front = []
+    for candidate in finite:
+        dominated = any(other.num_ctrl <= candidate.num_ctrl and other.max_error <= candidate.max_error
+                        and other.rms_error <= candidate.rms_error and other != candidate for other in front)
+        if not dominated:
+            front.append(candidate)
+    return front
+
+
+def bisect_ctrl_count(points, original_k, target_k, tolerance, max_ctrl=None, num_sample_points=400):
+    # Smallest control count of order target_k whose max error is within
+    # `tolerance`, assuming the error does not grow with more control points.
+    # Needs O(log max_ctrl) fits. Returns (best candidate or None, all fits).
+    # Uniform knot vectors of different lengths are not nested, so the
+    # assumption only holds approximately; sweep() gives the exact answer.
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if max_ctrl is None:
+        max_ctrl = default_max_ctrl(len(points), num_sample_points)
+    lo, hi = target_k, max_ctrl
+    if target_k == original_k and len(points) <= max_ctrl:
+        # The original curve itself is a zero-error fit of this size.
+        hi = len(points)
+    if hi < lo:
+        return None, []
+    fits = [fit_candidate(points, original_k, target_k, hi, num_sample_points)]
+    if not fits[0].max_error <= tolerance:
+        return None, fits
+    best = fits[0]
+    while lo < hi:
+        mid = (lo + hi) // 2
+        candidate = fit_candidate(points, original_k, target_k, mid, num_sample_points)
+        fits.append(candidate)
+        if candidate.max_error <= tolerance:
+            best, hi = candidate, mid
+        else:
+            lo = mid + 1
+    return best, fits
+
+
+def _bisect_task(args):
+    return bisect_ctrl_count(*args)
+
+
+def _best(results):
+    best = [candidate for candidate, _ in results if candidate is not None]
+    if not best:
+        return None
+    return min(best, key=lambda c: (c.num_ctrl, c.max_error))
+
+
+def cheapest_approximation(points, original_k, tolerance, target_orders=None, max_ctrl=None,
+                           num_sample_points=400, workers=None):
+    # Runs one bisection per order in parallel. Returns the candidate with
+    # the fewest control points that meets the tolerance (None if no order
+    # does), the Pareto front of all fits made along the way, and the fits.
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if target_orders is None:
+        target_orders = default_orders(original_k)
+    tasks = [(points, original_k, target_k, tolerance, max_ctrl, num_sample_points) for target_k in target_orders]
+    results = _map(_bisect_task, tasks, workers)
+    fits = [fit for _, order_fits in results for fit in order_fits]
+    return _best(results), pareto_front(fits), fits
+
+
+def _cheapest_serial_task(args):
+    points, original_k, tolerance, target_orders, max_ctrl, num_sample_points = args
+    best, front, _ = cheapest_approximation(points, original_k, tolerance, target_orders, max_ctrl,
+                                            num_sample_points, workers=1)
+    return best, front
+
+
+def cheapest_approximations(polygons, original_k, tolerance, target_orders=None, max_ctrl=None,
+                            num_sample_points=400, workers=None):
+    # Batch version: one task per control polygon, spread over the pool.
+    # Returns a (best, pareto front) pair per polygon.
+    if target_orders is not None:
+        target_orders = list(target_orders)
+    tasks = [(np.asarray(points, dtype=float).reshape(-1, 2), original_k, tolerance, target_orders, max_ctrl,
+              num_sample_points) for points in polygons]
+    return _map(_cheapest_serial_task, tasks, workers)
@@ -0,0 +1,83 @@
+import numpy as np
+
+DEFAULT_SUBDIVISIONS = 16
+QUADRATURE_ORDER = 5
+
+
+def speed(first):
+    return np.linalg.norm(np.asarray(first, dtype=float).reshape(len(first), -1), axis=1)
+
+
+def curvature(first, second):
+    # Signed curvature for planar curves, |C' x C''| / |C'|^3 otherwise; zero
+    # where the curve is not regular (C' = 0).
+    first = np.asarray(first, dtype=float).reshape(len(first), -1)
+    second = np.asarray(second, dtype=float).reshape(len(second), -1)
+    if first.shape[1] == 2:
+        cross = first[:, 0] * second[:, 1] - first[:, 1] * second[:, 0]
+    else:
+        cross = np.sqrt(np.maximum(np.einsum('ij,ij->i', first, first) * np.einsum('ij,ij->i', second, second)
+                                   - np.einsum('ij,ij->i', first, second) ** 2, 0.0))
+    cubed = speed(first) ** 3
+    return np.divide(cross, cubed, out=np.zeros(len(first)), where=cubed > 0)
+
+
+class ArcLengthTable:
+    # Cumulative arc length at the breakpoints, each interval split into
+    # `subdivisions` pieces and integrated with Gauss-Legendre quadrature of
+    # `speed`, the callable t -> |C'(t)|. Breakpoints should be the knots, so
+    # the integrand is smooth on every piece. A lookup is a binary search in
+    # the table and a cubic Hermite guess from dt/ds at the piece ends;
+    # optional Newton steps on the local integral refine it.
+    def __init__(self, speed, breakpoints, subdivisions=DEFAULT_SUBDIVISIONS, quadrature_order=QUADRATURE_ORDER):
+        breakpoints = np.asarray(breakpoints, dtype=float)
+        self.speed = speed
+        self._nodes, self._weights = np.polynomial.legendre.leggauss(quadrature_order)
+        fractions = np.arange(subdivisions) / subdivisions
+        t_values = (breakpoints[:-1, None] + fractions * np.diff(breakpoints)[:, None]).ravel()
+        self.t_values = np.append(t_values, breakpoints[-1])
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self._integrate(self.t_values[:-1], self.t_values[1:]))])
+        # dt/ds at both ends of every piece, for a cubic Hermite first guess
+        # of t(s). The end values are taken just inside the piece: at a knot
+        # C' may jump.
+        start_rate = self.speed(self.t_values[:-1])
+        end_rate = self.speed(np.nextafter(self.t_values[1:], self.t_values[:-1]))
+        self._start_slopes = np.divide(1.0, start_rate, out=np.zeros_like(start_rate), where=start_rate > 0)
+        self._end_slopes = np.divide(1.0, end_rate, out=np.zeros_like(end_rate), where=end_rate > 0)
+
+    @property
+    def length(self):
+        return self.cumulative[-1]
+
+    def _integrate(self, start, end):
+        half = 0.5 * (np.asarray(end, dtype=float) - start)
+        mid = start + half
+        x = mid[..., None] + half[..., None] * self._nodes
+        return half * (self.speed(x.ravel()).reshape(x.shape) @ self._weights)
+
+    def _interval(self, t_values):
+        return np.clip(np.searchsorted(self.t_values, t_values, side='right') - 1, 0, len(self.t_values) - 2)
+
+    def length_at(self, t_values):
+        t = np.clip(np.asarray(t_values, dtype=float), self.t_values[0], self.t_values[-1])
+        i = self._interval(t)
+        return self.cumulative[i] + self._integrate(self.t_values[i], t)
+
+    def parameter_at(self, lengths, newton_steps=0):
+        s = np.clip(np.asarray(lengths, dtype=float), 0.0, self.length)
+        i = np.clip(np.searchsorted(self.cumulative, s, side='right') - 1, 0, len(self.t_values) - 2)
+        start, end = self.t_values[i], self.t_values[i + 1]
+        piece = self.cumulative[i + 1] - self.cumulative[i]
+        u = np.divide(s - self.cumulative[i], piece, out=np.zeros_like(s), where=piece > 0)
+        h00, h10, h01, h11 = 2 * u ** 3 - 3 * u ** 2 + 1, u ** 3 - 2 * u ** 2 + u, -2 * u ** 3 + 3 * u ** 2, u ** 3 - u ** 2
+        t = h00 * start + h01 * end + piece * (h10 * self._start_slopes[i] + h11 * self._end_slopes[i])
+        t = np.clip(t, start, end)
+        for _ in range(newton_steps):
+            error = self.cumulative[i] + self._integrate(start, t) - s
+            rate = self.speed(t.ravel()).reshape(t.shape)
+            t = np.clip(t - np.divide(error, rate, out=np.zeros_like(t), where=rate > 0), start, end)
+        return t
+
+    def uniform_parameters(self, count):
+        # Parameters of `count` points equally spaced along the curve.
+        return self.parameter_at(np.linspace(0.0, self.length, count))
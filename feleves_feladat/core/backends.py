@@ -0,0 +1,96 @@
+import importlib
+import os
+import warnings
+from contextlib import contextmanager
+
+# Every backend is a module providing the functions in KERNELS with the
+# signatures of kernels_numpy, the reference that is always available.
+# The choice is made at runtime: set_backend(), use_backend() for a block,
+# or the GEOMETRIC_BACKEND environment variable (read on first use).
+# 'auto' takes the first backend in AUTO_ORDER that imports.
+ENV_VAR = 'GEOMETRIC_BACKEND'
+KERNELS = ('find_spans', 'nonzero_basis', 'de_casteljau_points', 'bernstein_matrix', 'barycentric_evaluate')
+REFERENCE = 'numpy'
+
+_MODULES = {'numpy': '.kernels_numpy', 'numba': '.kernels_numba'}
+AUTO_ORDER = ['numba', 'numpy']
+
+_loaded = {}
+_active = None
+
+
+def register_backend(name, module_name, preferred=False):
+    # module_name is absolute, or relative to this package when it starts
+    # with a dot. A preferred backend is tried first by 'auto'.
+    _MODULES[name] = module_name
+    _loaded.pop(name, None)
+    if name in AUTO_ORDER:
+        AUTO_ORDER.remove(name)
+    AUTO_ORDER.insert(0 if preferred else len(AUTO_ORDER) - 1, name)
+
+
+def load_backend(name):
+    # The backend module; ImportError when its dependency is missing.
+    if name not in _MODULES:
+        raise ValueError(f"unknown backend {name!r}, expected one of {sorted(_MODULES)}")
+    module = _loaded.get(name)
+    if module is None:
+        module = importlib.import_module(_MODULES[name], __package__)
+        missing = [kernel for kernel in KERNELS if not hasattr(module, kernel)]
+        if missing:
+            raise ValueError(f"backend {name!r} lacks {', '.join(missing)}")
+        _loaded[name] = module
+    return module
+
+
+def available_backends():
+    names = []
+    for name in _MODULES:
+        try:
+            load_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_backend(name='auto'):
+    # Returns the name of the backend now in use.
+    global _active
+    if name == 'auto':
+        for candidate in AUTO_ORDER:
+            try:
+                _active = (candidate, load_backend(candidate))
+                return candidate
+            except ImportError:
+                continue
+        name = REFERENCE
+    _active = (name, load_backend(name))
+    return name
+
+
+def get_backend():
+    if _active is None:
+        requested = os.environ.get(ENV_VAR, 'auto')
+        try:
+            set_backend(requested)
+        except (ImportError, ValueError) as error:
+            warnings.warn(f"{ENV_VAR}={requested!r} is not usable ({error}); using {REFERENCE}")
+            set_backend(REFERENCE)
+    return _active[1]
+
+
+def backend_name():
+    get_backend()
+    return _active[0]
+
+
+@contextmanager
+def use_backend(name):
+    global _active
+    previous = _active
+    set_backend(name)
+    try:
+        yield get_backend()
+    finally:
+        _active = previous
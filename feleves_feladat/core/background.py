@@ -0,0 +1,77 @@
+import threading
+
+
+class LatestJobWorker:
+    # One daemon thread that always runs the newest submitted job. A job that
+    # has not started is replaced by the next submit(); a running job cannot
+    # be interrupted, but once a newer job exists its result is dropped, so
+    # only the outcome of the latest submission is ever reported.
+    def __init__(self, name='latest-job-worker'):
+        self._condition = threading.Condition()
+        self._pending = None
+        self._running = None
+        self._finished = None
+        self._submitted = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def latest_id(self):
+        return self._submitted
+
+    def submit(self, function, *args):
+        with self._condition:
+            self._submitted += 1
+            self._pending = (self._submitted, function, args)
+            self._condition.notify_all()
+            return self._submitted
+
+    def cancel(self):
+        # Drops the pending job and invalidates the running one.
+        with self._condition:
+            self._submitted += 1
+            self._pending = None
+            self._condition.notify_all()
+
+    def busy(self):
+        with self._condition:
+            return self._pending is not None or self._running is not None
+
+    def take_result(self):
+        # (job id, result, exception) of the latest finished job, once; None
+        # when nothing new has finished since the last call.
+        with self._condition:
+            finished, self._finished = self._finished, None
+            return finished
+
+    def wait(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and self._running is None, timeout)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                job_id, function, args = self._pending
+                self._pending = None
+                self._running = job_id
+            result, error = None, None
+            try:
+                result = function(*args)
+            except Exception as exception:
+                error = exception
+            with self._condition:
+                self._running = None
+                if job_id == self._submitted:
+                    self._finished = (job_id, result, error)
+                self._condition.notify_all()
@@ -0,0 +1,94 @@
+import numpy as np
+
+_banded_solvers = None
+
+
+def banded_solvers():
+    # scipy.linalg takes about 0.2 s to import, so it is loaded on the first
+    # factorization instead of with the module. Returns None without SciPy.
+    global _banded_solvers
+    if _banded_solvers is None:
+        try:
+            from scipy.linalg import cholesky_banded, cho_solve_banded
+            _banded_solvers = (cholesky_banded, cho_solve_banded)
+        except ImportError:
+            _banded_solvers = ()
+    return _banded_solvers or None
+
+
+# Below this squared ratio of the smallest to the largest Cholesky pivot the
+# normal equations are treated as rank-deficient and the SVD path is used.
+RANK_TOLERANCE = 1e-10
+
+
+def normal_matrix_banded(cols, weights, m):
+    # B^T B in LAPACK upper banded storage: ab[u + i - j, j] = (B^T B)[i, j].
+    k = cols.shape[1]
+    u = k - 1
+    ab = np.zeros((k, m))
+    for a in range(k):
+        for b in range(a, k):
+            ab[u - (b - a)] += np.bincount(cols[:, b], weights=weights[:, a] * weights[:, b], minlength=m)
+    return ab
+
+
+def normal_rhs(cols, weights, m, samples):
+    samples = np.asarray(samples, dtype=float)
+    flat = samples.reshape(len(samples), -1)
+    rhs = np.zeros((m, flat.shape[1]))
+    for j in range(cols.shape[1]):
+        for d in range(flat.shape[1]):
+            rhs[:, d] += np.bincount(cols[:, j], weights=weights[:, j] * flat[:, d], minlength=m)
+    return rhs.reshape((m,) + samples.shape[1:])
+
+
+def _banded_to_dense(ab):
+    u, m = ab.shape[0] - 1, ab.shape[1]
+    dense = np.zeros((m, m))
+    for offset in range(u + 1):
+        diagonal = ab[u - offset, offset:]
+        dense[np.arange(m - offset), np.arange(offset, m)] = diagonal
+        dense[np.arange(offset, m), np.arange(m - offset)] = diagonal
+    return dense
+
+
+def factor_normal_matrix(ab):
+    # Control points whose basis function no sample reaches have an empty
+    # column; like the pseudo-inverse, the solution leaves them at zero. Only
+    # such columns at either end are cut off, any other rank deficiency
+    # returns None so the caller can fall back to the SVD.
+    active = np.flatnonzero(ab[-1] > 0)
+    if len(active) == 0:
+        return None
+    lo, hi = active[0], active[-1] + 1
+    if hi - lo != len(active):
+        return None
+    block = ab[:, lo:hi]
+    solvers = banded_solvers()
+    if solvers is not None:
+        try:
+            factor = solvers[0](block, lower=False)
+        except np.linalg.LinAlgError:
+            return None
+        pivots = factor[-1]
+        method = 'banded_cholesky'
+    else:
+        try:
+            factor = np.linalg.cholesky(_banded_to_dense(block))
+        except np.linalg.LinAlgError:
+            return None
+        pivots = np.diag(factor)
+        method = 'dense_cholesky'
+    if (pivots.min() / pivots.max()) ** 2 < RANK_TOLERANCE:
+        return None
+    return method, factor, lo, hi
+
+
+def solve_factored(factored, rhs):
+    method, factor, lo, hi = factored
+    solution = np.zeros_like(rhs)
+    if method == 'banded_cholesky':
+        solution[lo:hi] = banded_solvers()[1]((factor, False), rhs[lo:hi])
+    else:
+        solution[lo:hi] = np.linalg.solve(factor.T, np.linalg.solve(factor, rhs[lo:hi]))
+    return solution
@@ -0,0 +1,53 @@
+from math import lgamma
+
+import numpy as np
+
+from . import backends
+
+
+def equispaced_nodes(n):
+    return np.linspace(0, 1, n)
+
+
+def chebyshev_nodes(n):
+    # Chebyshev points of the second kind, mapped to [0, 1].
+    if n == 1:
+        return np.zeros(1)
+    return 0.5 - 0.5 * np.cos(np.pi * np.arange(n) / (n - 1))
+
+
+def equispaced_weights(n):
+    # (-1)^j C(n - 1, j), computed in log space and scaled so the largest
+    # weight is 1; only the ratios matter to the barycentric formula.
+    j = np.arange(n)
+    log_binom = np.array([lgamma(n) - lgamma(i + 1) - lgamma(n - i) for i in j])
+    return np.where(j % 2 == 0, 1.0, -1.0) * np.exp(log_binom - log_binom.max())
+
+
+def chebyshev_weights(n):
+    weights = np.where(np.arange(n) % 2 == 0, 1.0, -1.0)
+    weights[0] *= 0.5
+    weights[-1] *= 0.5
+    return weights
+
+
+def node_weights(nodes):
+    # General O(n^2) weights 1 / prod_{k != j} (x_j - x_k), in log space.
+    nodes = np.asarray(nodes, dtype=float)
+    diff = nodes[:, None] - nodes[None, :]
+    np.fill_diagonal(diff, 1.0)
+    sign = np.prod(np.sign(diff), axis=1)
+    log_abs = -np.sum(np.log(np.abs(diff)), axis=1)
+    return sign * np.exp(log_abs - log_abs.max())
+
+
+class BarycentricInterpolator:
+    def __init__(self, nodes, values, weights=None):
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.weights = node_weights(self.nodes) if weights is None else np.asarray(weights, dtype=float)
+
+    def __call__(self, t_values):
+        t = np.asarray(t_values, dtype=float).ravel()
+        result = backends.get_backend().barycentric_evaluate(self.nodes, self.weights, self.values, t)
+        return result.reshape(np.shape(t_values) + self.values.shape[1:])
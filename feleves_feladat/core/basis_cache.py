@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from . import backends
+
+
+class BasisCache:
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(kind, n, k, t_values, knots):
+        # The compute backend is part of the key, so switching it never
+        # returns arrays the other backend computed.
+        t_values = np.ascontiguousarray(t_values, dtype=float)
+        knots = np.ascontiguousarray(knots, dtype=float)
+        return (kind, backends.backend_name(), n, k, len(t_values), knots.tobytes(), t_values.tobytes())
+
+    @staticmethod
+    def _size_of(value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, (tuple, list)):
+            return sum(BasisCache._size_of(v) for v in value)
+        return 0
+
+    @staticmethod
+    def _freeze(value):
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        elif isinstance(value, (tuple, list)):
+            for v in value:
+                BasisCache._freeze(v)
+
+    def get_or_compute(self, key, compute):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+        self.misses += 1
+        value = compute()
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return value
+        self._freeze(value)
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
@@ -0,0 +1,154 @@
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from .bspline_approximator import BSplineApproximator
+from .bspline_calculator import BSplineCalculator
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def _is_npy(path):
+    return str(path).lower().endswith('.npy')
+
+
+def _csv_rows(path):
+    # One control polygon per line: x0,y0,x1,y1,... Empty lines and lines
+    # starting with '#' are skipped.
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].lstrip().startswith('#'):
+                continue
+            values = np.array([float(value) for value in row if value.strip()])
+            yield values.reshape(-1, 2)
+
+
+def count_polygons(path):
+    if _is_npy(path):
+        return len(np.load(path, mmap_mode='r'))
+    return sum(1 for _ in _csv_rows(path))
+
+
+def read_polygons(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Yields (index of the first polygon, (c, n, 2) array) chunks. A .npy
+    # input is memory-mapped; CSV polygons are grouped into chunks of
+    # consecutive rows with the same point count.
+    if _is_npy(path):
+        data = np.load(path, mmap_mode='r')
+        if data.ndim == 2:
+            data = data.reshape(len(data), -1, 2)
+        for start in range(0, len(data), chunk_size):
+            yield start, np.asarray(data[start:start + chunk_size], dtype=float)
+        return
+    start, pending = 0, []
+    for polygon in _csv_rows(path):
+        if pending and (len(pending) == chunk_size or len(polygon) != len(pending[0])):
+            yield start, np.stack(pending)
+            start += len(pending)
+            pending = []
+        pending.append(polygon)
+    if pending:
+        yield start, np.stack(pending)
+
+
+class CurveWriter:
+    # Writes (c, num_points, dim) chunks of sampled curves. A .npy output is
+    # a memory-mapped array of known size; CSV gets one flattened curve per
+    # line. Curves that could not be computed are NaN (npy) or empty (CSV).
+    def __init__(self, path, count, num_points, dim=2):
+        self.path = path
+        if _is_npy(path):
+            self._array = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(count, num_points, dim))
+            self._file = None
+        else:
+            self._array = None
+            self._file = open(path, 'w', newline='')
+            self._writer = csv.writer(self._file)
+
+    def write(self, start, curves):
+        if self._array is not None:
+            if curves.shape[1] == 0:
+                self._array[start:start + len(curves)] = np.nan
+            else:
+                self._array[start:start + len(curves)] = curves
+            return
+        for curve in curves:
+            self._writer.writerow([repr(value) for value in curve.ravel().tolist()])
+
+    def write_empty(self, start, count):
+        self.write(start, np.empty((count, 0, 2)))
+
+    def close(self):
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def evaluate_stream(chunks, writer, k, num_points, calculator=None):
+    calculator = calculator or BSplineCalculator()
+    for start, chunk in chunks:
+        writer.write(start, calculator.compute_bspline_batch(chunk, k, num_points))
+
+
+def fit_stream(chunks, writer, report, original_k, target_k, num_target_ctrl_points=None,
+               num_points=200, num_sample_points=400, calculator=None):
+    # `report` is a csv.writer or None; it receives index, point count, max
+    # and RMS error per curve. The written curves are the fitted ones.
+    calculator = calculator or BSplineCalculator()
+    approximator = BSplineApproximator(calculator)
+    for start, chunk in chunks:
+        new_ctrl, max_errors, rms_errors = approximator.least_squares_batch(
+            chunk, original_k, target_k, num_target_ctrl_points, num_sample_points)
+        if new_ctrl.shape[1] == 0:
+            writer.write_empty(start, len(chunk))
+            max_errors = rms_errors = np.full(len(chunk), np.nan)
+        else:
+            writer.write(start, calculator.compute_bspline_batch(new_ctrl, target_k, num_points))
+        if report is not None:
+            for i in range(len(chunk)):
+                report.writerow([start + i, chunk.shape[1], max_errors[i], rms_errors[i]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate or least-squares fit B-splines from a file of control polygons.')
+    parser.add_argument('input', help='.npy array of shape (count, n, 2) or CSV with one x0,y0,x1,y1,... polygon per line')
+    parser.add_argument('output', help='sampled curves, .npy or .csv')
+    parser.add_argument('--mode', choices=('evaluate', 'fit'), default='evaluate')
+    parser.add_argument('-k', '--order', type=int, default=4, help='order of the input B-splines')
+    parser.add_argument('--samples', type=int, default=200, help='points per output curve')
+    parser.add_argument('--target-k', type=int, default=3, help='order of the fitted B-spline (fit mode)')
+    parser.add_argument('--target-ctrl', type=int, help='control points of the fitted B-spline (default: same as input)')
+    parser.add_argument('--fit-samples', type=int, default=400, help='samples of the input curve used by the fit')
+    parser.add_argument('--report', help='CSV error report per curve (fit mode)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    count = count_polygons(args.input) if _is_npy(args.output) else 0
+    writer = CurveWriter(args.output, count, args.samples)
+    chunks = read_polygons(args.input, args.chunk_size)
+    try:
+        if args.mode == 'evaluate':
+            evaluate_stream(chunks, writer, args.order, args.samples)
+        else:
+            report_file = open(args.report, 'w', newline='') if args.report else None
+            try:
+                report = csv.writer(report_file) if report_file else None
+                if report is not None:
+                    report.writerow(['index', 'n', 'max_error', 'rms_error'])
+                fit_stream(chunks, writer, report, args.order, args.target_k, args.target_ctrl,
+                           args.samples, args.fit_samples)
+            finally:
+                if report_file:
+                    report_file.close()
+    finally:
+        writer.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
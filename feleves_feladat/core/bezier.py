@@ -0,0 +1,73 @@
+from math import comb
+
+import numpy as np
+
+from . import backends
+
+
+def de_casteljau(ctrl, t_values, pyramid_indices=()):
+    # Runs the De Casteljau reduction for all parameters at once on a
+    # (T, n, dim) tensor. The intermediate control polygons are only kept for
+    # the parameters listed in `pyramid_indices`; for each of them the result
+    # holds one (n - r, dim) array per level r = 1 .. n - 1.
+    ctrl = np.asarray(ctrl, dtype=float)
+    t = np.asarray(t_values, dtype=float)[:, None, None]
+    points = np.array(np.broadcast_to(ctrl, (t.shape[0],) + ctrl.shape))
+    pyramid_indices = list(pyramid_indices)
+    pyramids = [[] for _ in pyramid_indices]
+    for m in range(len(ctrl) - 1, 0, -1):
+        points[:, :m] += t * (points[:, 1:m + 1] - points[:, :m])
+        if pyramid_indices:
+            level = points[pyramid_indices, :m].copy()
+            for pyramid, polygon in zip(pyramids, level):
+                pyramid.append(polygon)
+    return points[:, 0], pyramids
+
+
+def de_casteljau_points(ctrl, t_values):
+    return backends.get_backend().de_casteljau_points(ctrl, t_values)
+
+
+def bernstein_matrix(degree, t_values):
+    return backends.get_backend().bernstein_matrix(degree, t_values)
+
+
+def rational_bezier_points(ctrl, weights, basis):
+    # One product in homogeneous coordinates (w * P, w), then one divide.
+    ctrl = np.asarray(ctrl, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    homogeneous = basis @ np.column_stack([ctrl * weights[:, None], weights])
+    return homogeneous[:, :-1] / homogeneous[:, -1:]
+
+
+def split_bezier(segments, t=0.5):
+    # Splits a (S, m, dim) batch of control polygons at t with one De
+    # Casteljau pass; the left and right polygons are the first and last
+    # points of the intermediate levels.
+    points = np.array(segments, dtype=float)
+    m = points.shape[1]
+    left = np.empty_like(points)
+    right = np.empty_like(points)
+    left[:, 0] = points[:, 0]
+    right[:, -1] = points[:, -1]
+    for r in range(1, m):
+        points[:, :m - r] += t * (points[:, 1:m - r + 1] - points[:, :m - r])
+        left[:, r] = points[:, 0]
+        right[:, m - 1 - r] = points[:, m - 1 - r]
+    return left, right
+
+
+def power_matrix(degree):
+    # Maps Bezier control points to the coefficients a_j of u^j.
+    i = np.arange(degree + 1)
+    signs = (-1.0) ** (i[:, None] - i[None, :])
+    binomials = np.array([[comb(j, r) for r in i] for j in i], dtype=float)
+    scale = np.array([comb(degree, j) for j in i], dtype=float)[:, None]
+    return np.tril(scale * binomials * signs)
+
+
+def power_coefficients(segments):
+    # (S, m, dim) Bezier polygons -> (S, m, dim) power-basis coefficients, so
+    # a segment and its derivatives can be evaluated with Horner's rule.
+    segments = np.asarray(segments, dtype=float)
+    return np.einsum('ji,si...->sj...', power_matrix(segments.shape[1] - 1), segments)
@@ -1,123 +1,160 @@
 import numpy as np
 from .bspline_calculator import BSplineCalculator
+from .incremental import IncrementalBSpline
+from . import banded_lsq
+from . import approximation_error
+from .projection import CurveProjector, hausdorff_distance
 
 class BSplineApproximator:
     def __init__(self, calculator: BSplineCalculator):
         self.calculator = calculator
-
-    def compute_approximation_by_order(self, original_points, original_k, approx_k, num_eval_points=200):
-        n = len(original_points)
+        self._original_curve = IncrementalBSpline(calculator)
+        self._approx_curve = IncrementalBSpline(calculator)
+        self.last_solver = None
+
+    def _closest_point_errors(self, reference, ctrl, k, knots):
+        # Distance from every reference point to the nearest point of the
+        # curve (ctrl, k), wherever on that curve it lies.
+        return CurveProjector(ctrl, k, knots, calculator=self.calculator).project(reference)[2]
+
+    def compute_approximation_by_order(self, original_points, original_k, approx_k, num_eval_points=200, spacing='parameter', metric='parameter'):
+        ctrl = np.asarray(original_points, dtype=float).reshape(-1, 2)
+        n = len(ctrl)
         if n < original_k or n < approx_k or original_k < 2 or approx_k < 2:
-            return [], 0.0, 0.0, []
+            return np.empty((0, 2)), 0.0, 0.0, np.empty(0)
 
         knots_orig = np.linspace(0, 1, n + original_k)
         start_t_orig = knots_orig[original_k - 1]
         end_t_orig = knots_orig[n]
         if start_t_orig >= end_t_orig:
-            return [], 0.0, 0.0, []
+            return np.empty((0, 2)), 0.0, 0.0, np.empty(0)
 
         t_values = np.linspace(start_t_orig, end_t_orig, num_eval_points)
-
-        original_curve_points = []
-        knots_orig_eval = np.linspace(0, 1, n + original_k)
-        for t in t_values:
-            x, y = 0.0, 0.0
-            for i in range(n):
-                basis = self.calculator.basis_function(i, original_k, t, knots_orig_eval)
-                x += basis * original_points[i]['x']
-                y += basis * original_points[i]['y']
-            original_curve_points.append({'x': x, 'y': y})
-
-        approx_curve_points = []
+        if spacing != 'parameter':
+            # Compare the curves at points equally spaced along the original.
+            t_values = self.calculator.sample_parameters(ctrl, original_k, num_eval_points, spacing)[1]
+
+        # Arc-length parameters change with every edit; keep them out of the
+        # basis cache.
+        cache = spacing == 'parameter'
+        original_curve = self._original_curve.evaluate(ctrl, original_k, t_values, knots_orig, cache)
         knots_approx_eval = np.linspace(0, 1, n + approx_k)
-        for t in t_values:
-            x, y = 0.0, 0.0
-            for i in range(n):
-                basis = self.calculator.basis_function(i, approx_k, t, knots_approx_eval)
-                x += basis * original_points[i]['x']
-                y += basis * original_points[i]['y']
-            approx_curve_points.append({'x': x, 'y': y})
-
-        if not original_curve_points or not approx_curve_points or len(original_curve_points) != len(approx_curve_points):
-            return [], 0.0, 0.0, []
-
-        errors = []
-        for p1, p2 in zip(original_curve_points, approx_curve_points):
-            error = ((p1['x'] - p2['x']) ** 2 + (p1['y'] - p2['y']) ** 2) ** 0.5
-            errors.append(error)
-
-        errors_np = np.array(errors)
-        max_error = np.max(errors_np) if errors_np.size > 0 else 0.0
-        rms_error = np.sqrt(np.mean(errors_np ** 2)) if errors_np.size > 0 else 0.0
-
-        return approx_curve_points, max_error, rms_error, errors
-
-    def least_squares_approximation(self, original_points, original_k, target_k, num_target_ctrl_points=None, num_sample_points=400):
-        n_orig = len(original_points)
+        approx_curve = self._approx_curve.evaluate(ctrl, approx_k, t_values, knots_approx_eval, cache)
+
+        if len(original_curve) == 0 or len(original_curve) != len(approx_curve):
+            return np.empty((0, 2)), 0.0, 0.0, np.empty(0)
+
+        if metric == 'closest_point':
+            errors_np = self._closest_point_errors(original_curve, ctrl, approx_k, knots_approx_eval)
+        else:
+            errors_np = approximation_error.pointwise_errors(original_curve, approx_curve)
+        summary = approximation_error.summarize(errors_np, percentiles=())
+
+        return approx_curve, summary['max'], summary['rms'], errors_np
+
+    def least_squares_approximation(self, original_points, original_k, target_k, num_target_ctrl_points=None, num_sample_points=400, spacing='parameter', metric='parameter'):
+        ctrl = np.asarray(original_points, dtype=float).reshape(-1, 2)
+        n_orig = len(ctrl)
         if num_target_ctrl_points is None:
             num_target_ctrl_points = n_orig
 
         if n_orig < original_k or num_target_ctrl_points < target_k or original_k < 2 or target_k < 2:
-            return [], 0.0, 0.0
+            return np.empty((0, 2)), 0.0, 0.0
 
         knots_orig = np.linspace(0, 1, n_orig + original_k)
         start_t_orig = knots_orig[original_k - 1]
         end_t_orig = knots_orig[n_orig]
         if start_t_orig >= end_t_orig:
-            return [], 0.0, 0.0
+            return np.empty((0, 2)), 0.0, 0.0
 
         t_values_sample = np.linspace(start_t_orig, end_t_orig, num_sample_points)
-
-        original_curve_samples = []
-        knots_orig_eval = np.linspace(0, 1, n_orig + original_k)
-        for t in t_values_sample:
-            x, y = 0.0, 0.0
-            for i in range(n_orig):
-                basis = self.calculator.basis_function(i, original_k, t, knots_orig_eval)
-                x += basis * original_points[i]['x']
-                y += basis * original_points[i]['y']
-            original_curve_samples.append({'x': x, 'y': y})
-
-        if not original_curve_samples:
-            return [], 0.0, 0.0
-
-        x_target = np.array([p['x'] for p in original_curve_samples])
-        y_target = np.array([p['y'] for p in original_curve_samples])
+        if spacing != 'parameter':
+            # Equal arc-length samples weight every part of the curve alike.
+            t_values_sample = self.calculator.sample_parameters(ctrl, original_k, num_sample_points, spacing)[1]
 
         n_approx_ctrl = num_target_ctrl_points
         k_approx = target_k
         knots_approx_basis = np.linspace(0, 1, n_approx_ctrl + k_approx)
+        calculator = self.calculator
+        if spacing == 'parameter':
+            original_curve_samples = calculator.evaluate(ctrl, original_k, t_values_sample, knots_orig)
+            cols, weights = calculator.cached_sparse_basis(n_approx_ctrl, k_approx, t_values_sample, knots_approx_basis)
+            factored = calculator.cached_normal_factor(n_approx_ctrl, k_approx, t_values_sample, knots_approx_basis)
+        else:
+            # Arc-length parameters change with every edit; keep them out of
+            # the basis cache.
+            original_curve_samples = calculator.evaluate_sparse(
+                ctrl, *calculator.sparse_basis(n_orig, original_k, t_values_sample, knots_orig))
+            cols, weights = calculator.sparse_basis(n_approx_ctrl, k_approx, t_values_sample, knots_approx_basis)
+            factored = calculator.normal_factor(n_approx_ctrl, k_approx, t_values_sample, knots_approx_basis)
+        if len(original_curve_samples) == 0:
+            return np.empty((0, 2)), 0.0, 0.0
+
+        if factored is not None:
+            rhs = banded_lsq.normal_rhs(cols, weights, n_approx_ctrl, original_curve_samples)
+            new_ctrl = banded_lsq.solve_factored(factored, rhs)
+            self.last_solver = factored[0]
+        else:
+            if spacing == 'parameter':
+                pinv_B = calculator.cached_pinv(n_approx_ctrl, k_approx, t_values_sample, knots_approx_basis)
+            else:
+                pinv_B = np.linalg.pinv(calculator.basis_matrix(n_approx_ctrl, k_approx, t_values_sample,
+                                                                knots_approx_basis))
+            new_ctrl = pinv_B @ original_curve_samples
+            self.last_solver = 'svd'
+
+        approx_curve_evaluated = self.calculator.evaluate_sparse(new_ctrl, cols, weights)
+
+        if len(approx_curve_evaluated) != len(original_curve_samples):
+            return new_ctrl, 0.0, 0.0
+
+        if metric == 'closest_point':
+            # Same-parameter errors overstate the deviation wherever the fit
+            # is reparametrized; this measures how far the shape itself is.
+            errors_np = self._closest_point_errors(original_curve_samples, new_ctrl, k_approx, knots_approx_basis)
+        else:
+            errors_np = approximation_error.pointwise_errors(original_curve_samples, approx_curve_evaluated)
+        summary = approximation_error.summarize(errors_np, percentiles=())
+
+        return new_ctrl, summary['max'], summary['rms']
+
+    def hausdorff(self, original_points, original_k, approx_points, approx_k):
+        # One-sided distances between the two curves in both directions and
+        # the symmetric Hausdorff distance; see projection.hausdorff_distance.
+        return hausdorff_distance(original_points, original_k, approx_points, approx_k, calculator=self.calculator)
+
+    def least_squares_batch(self, original_batch, original_k, target_k, num_target_ctrl_points=None, num_sample_points=400):
+        # Fits every control polygon of a (batch, n, dim) array at once. All
+        # curves share the sample parameters and the target basis, so the
+        # normal matrix is factored once and solved for all right-hand sides.
+        ctrl = np.asarray(original_batch, dtype=float)
+        batch, n_orig, dim = ctrl.shape
+        if num_target_ctrl_points is None:
+            num_target_ctrl_points = n_orig
+        empty = np.empty((batch, 0, dim)), np.zeros(batch), np.zeros(batch)
 
-        B = np.zeros((len(t_values_sample), n_approx_ctrl))
-        for i, t in enumerate(t_values_sample):
-            for j in range(n_approx_ctrl):
-                B[i, j] = self.calculator.basis_function(j, k_approx, t, knots_approx_basis)
-
-        pinv_B = np.linalg.pinv(B)
-        ctrl_x = pinv_B @ x_target
-        ctrl_y = pinv_B @ y_target
-        new_ctrl_pts = [{'x': ctrl_x[i], 'y': ctrl_y[i]} for i in range(n_approx_ctrl)]
-
-        approx_curve_evaluated = []
-        knots_approx_eval = np.linspace(0, 1, n_approx_ctrl + k_approx)
-        for t in t_values_sample:
-            x, y = 0.0, 0.0
-            for i in range(n_approx_ctrl):
-                basis = self.calculator.basis_function(i, k_approx, t, knots_approx_eval)
-                x += basis * new_ctrl_pts[i]['x']
-                y += basis * new_ctrl_pts[i]['y']
-            approx_curve_evaluated.append({'x': x, 'y': y})
-
-        if not approx_curve_evaluated or len(approx_curve_evaluated) != len(original_curve_samples):
-            return new_ctrl_pts, 0.0, 0.0
-
-        errors = []
-        for p_orig, p_approx in zip(original_curve_samples, approx_curve_evaluated):
-            error = ((p_orig['x'] - p_approx['x']) ** 2 + (p_orig['y'] - p_approx['y']) ** 2) ** 0.5
-            errors.append(error)
-
-        errors_np = np.array(errors)
-        max_error = np.max(errors_np) if errors_np.size > 0 else 0.0
-        rms_error = np.sqrt(np.mean(errors_np ** 2)) if errors_np.size > 0 else 0.0
-
-        return new_ctrl_pts, max_error, rms_error
+        if n_orig < original_k or num_target_ctrl_points < target_k or original_k < 2 or target_k < 2:
+            return empty
+        params = self.calculator.uniform_parameters(n_orig, original_k, num_sample_points)
+        if params is None:
+            return empty
+        knots_orig, t_values_sample = params
+
+        samples = np.matmul(self.calculator.cached_basis_matrix(n_orig, original_k, t_values_sample, knots_orig), ctrl)
+
+        m = num_target_ctrl_points
+        knots_approx_basis = np.linspace(0, 1, m + target_k)
+        B = self.calculator.cached_basis_matrix(m, target_k, t_values_sample, knots_approx_basis)
+        flat_samples = samples.transpose(1, 0, 2).reshape(len(t_values_sample), -1)
+
+        factored = self.calculator.cached_normal_factor(m, target_k, t_values_sample, knots_approx_basis)
+        if factored is not None:
+            flat_ctrl = banded_lsq.solve_factored(factored, B.T @ flat_samples)
+            self.last_solver = factored[0]
+        else:
+            flat_ctrl = self.calculator.cached_pinv(m, target_k, t_values_sample, knots_approx_basis) @ flat_samples
+            self.last_solver = 'svd'
+
+        new_ctrl = flat_ctrl.reshape(m, batch, dim).transpose(1, 0, 2)
+        errors = np.sqrt(np.sum((np.matmul(B, new_ctrl) - samples) ** 2, axis=-1))
+        return new_ctrl, errors.max(axis=1), np.sqrt(np.mean(errors ** 2, axis=1))
@@ -1,6 +1,15 @@
 import numpy as np
+from .basis_cache import BasisCache
+from . import backends, banded_lsq
+from .arc_length import ArcLengthTable, speed
+from .tessellation import DEFAULT_TOLERANCE, flatten_bezier
 
 class BSplineCalculator:
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else BasisCache()
+        # (key, table) of the last curve's arc-length table.
+        self._arc_length = None
+
     @staticmethod
     def basis_function(i, k, t, knots):
         if k == 1:
@@ -15,27 +24,301 @@ class BSplineCalculator:
             return term1 + term2
 
     @staticmethod
-    def compute_bspline(points, k, num_points=200):
-        n = len(points)
-        if n < k:
-            return []
+    def find_spans(t_values, knots):
+        # Same half-open rule as basis_function: knots[s] <= t < knots[s + 1].
+        # Parameters outside [knots[0], knots[-1]) get -1.
+        return backends.get_backend().find_spans(t_values, knots)
+
+    @staticmethod
+    def nonzero_basis(k, t_values, knots):
+        # For every t only the k basis functions N_{s-k+1..s, k} of its span s
+        # can be nonzero; the active compute backend evaluates them.
+        return backends.get_backend().nonzero_basis(k, t_values, knots)
+
+    @staticmethod
+    def sparse_basis(n, k, t_values, knots):
+        # (T, k) column indices and weights of the nonzero basis functions;
+        # columns outside [0, n) are clipped and carry zero weight.
+        spans, values = BSplineCalculator.nonzero_basis(k, t_values, knots)
+        cols = spans[:, None] - (k - 1) + np.arange(k)
+        valid = (cols >= 0) & (cols < n) & (spans[:, None] >= 0)
+        return np.clip(cols, 0, max(n - 1, 0)), np.where(valid, values, 0.0)
+
+    @staticmethod
+    def basis_matrix(n, k, t_values, knots):
+        cols, weights = BSplineCalculator.sparse_basis(n, k, t_values, knots)
+        B = np.zeros((len(cols), n))
+        np.add.at(B, (np.arange(len(cols))[:, None], cols), weights)
+        return B
+
+    def cached_nonzero_basis(self, n, k, t_values, knots):
+        key = BasisCache.make_key('nonzero', n, k, t_values, knots)
+        return self.cache.get_or_compute(key, lambda: self.nonzero_basis(k, t_values, knots))
+
+    def cached_spans(self, n, k, t_values, knots):
+        return self.cached_nonzero_basis(n, k, t_values, knots)[0]
+
+    def cached_sparse_basis(self, n, k, t_values, knots):
+        key = BasisCache.make_key('sparse', n, k, t_values, knots)
+        return self.cache.get_or_compute(key, lambda: self.sparse_basis(n, k, t_values, knots))
+
+    def cached_basis_matrix(self, n, k, t_values, knots):
+        key = BasisCache.make_key('basis', n, k, t_values, knots)
+        return self.cache.get_or_compute(key, lambda: self.basis_matrix(n, k, t_values, knots))
+
+    def cached_pinv(self, n, k, t_values, knots):
+        key = BasisCache.make_key('pinv', n, k, t_values, knots)
+        return self.cache.get_or_compute(
+            key, lambda: np.linalg.pinv(self.cached_basis_matrix(n, k, t_values, knots)))
+
+    @staticmethod
+    def normal_factor(n, k, t_values, knots):
+        cols, weights = BSplineCalculator.sparse_basis(n, k, t_values, knots)
+        return banded_lsq.factor_normal_matrix(banded_lsq.normal_matrix_banded(cols, weights, n))
+
+    def cached_normal_factor(self, n, k, t_values, knots):
+        def compute():
+            cols, weights = self.cached_sparse_basis(n, k, t_values, knots)
+            return banded_lsq.factor_normal_matrix(banded_lsq.normal_matrix_banded(cols, weights, n))
+
+        key = BasisCache.make_key('normal_factor', n, k, t_values, knots)
+        return self.cache.get_or_compute(key, compute)
+
+    @staticmethod
+    def insert_knot(ctrl, k, knots, t, times=1, span=None):
+        # Boehm's algorithm: the curve is unchanged, the knot vector gains t
+        # `times` times and the control polygon one point per insertion.
+        # `span` may name the span to insert into, any s with
+        # knots[s] <= t <= knots[s + 1]; it stays valid for every insertion.
+        ctrl = np.asarray(ctrl, dtype=float)
+        knots = np.asarray(knots, dtype=float)
+        degree = k - 1
+        given = span
+        for _ in range(times):
+            # Span with knots[s] <= t <= knots[s + 1], kept among the spans
+            # that have all k control points.
+            if given is None:
+                span = np.searchsorted(knots, t, side='right') - 1
+                span = max(degree, min(span, len(ctrl) - 1))
+            i = np.arange(span - degree + 1, span + 1)
+            denom = knots[i + degree] - knots[i]
+            alpha = np.divide(t - knots[i], denom, out=np.zeros(len(i)), where=denom != 0)
+            alpha = alpha.reshape((-1,) + (1,) * (ctrl.ndim - 1))
+            refined = np.empty((len(ctrl) + 1,) + ctrl.shape[1:])
+            refined[:span - degree + 1] = ctrl[:span - degree + 1]
+            refined[i] = alpha * ctrl[i] + (1 - alpha) * ctrl[i - 1]
+            refined[span + 1:] = ctrl[span:]
+            ctrl = refined
+            knots = np.insert(knots, span + 1, t)
+        return ctrl, knots
+
+    @staticmethod
+    def insert_knots(ctrl, k, knots, t_values):
+        # Exact refinement: the refined curve is the same curve, not a fit.
+        for t in np.atleast_1d(t_values):
+            ctrl, knots = BSplineCalculator.insert_knot(ctrl, k, knots, t)
+        return ctrl, knots
+
+    @staticmethod
+    def bezier_extraction(n, k, knots):
+        # One (k, k) matrix per domain span j = k - 1 .. n - 1 that maps the k
+        # control points P[j - k + 1 .. j] to the span's Bezier control points.
+        # Built by raising both span ends to multiplicity k - 1 with Boehm's
+        # algorithm, applied to the identity so the result is the operator.
+        # In the local knots the span starts at index k - 1 and moves right
+        # with every knot inserted at its start. A zero-width span (repeated
+        # knot) gets a degenerate segment: k copies of the curve point there,
+        # its left limit where the curve is discontinuous.
+        knots = np.asarray(knots, dtype=float)
+        degree = k - 1
+        matrices = np.empty((n - degree, k, k))
+        for s, j in enumerate(range(degree, n)):
+            local_knots = knots[j - degree:j + k + 1]
+            local = np.eye(k)
+            span = degree
+            start, end = knots[j], knots[j + 1]
+            times = degree - np.count_nonzero(local_knots == start)
+            if times > 0:
+                local, local_knots = BSplineCalculator.insert_knot(local, k, local_knots, start, times, span)
+                span += times
+            if end > start:
+                times = degree - np.count_nonzero(local_knots == end)
+                if times > 0:
+                    local, local_knots = BSplineCalculator.insert_knot(local, k, local_knots, end, times, span)
+                matrices[s] = local[span - degree:span + 1]
+            else:
+                # With the knot at least k - 1 times from index r on, the
+                # curve point is control point r - 1.
+                first = np.searchsorted(local_knots, start, side='left')
+                matrices[s] = local[max(first - 1, 0)]
+        return matrices
+
+    def cached_bezier_extraction(self, n, k, knots):
+        key = BasisCache.make_key('bezier', n, k, (), knots)
+        return self.cache.get_or_compute(key, lambda: self.bezier_extraction(n, k, knots))
 
+    def to_bezier(self, ctrl, k, knots=None):
+        # (spans, k, dim) Bezier control polygons of the curve, one per domain
+        # span; with cached matrices this is one small product per edit.
+        ctrl = np.asarray(ctrl, dtype=float)
+        n = len(ctrl)
+        if n < k or k < 2:
+            return np.empty((0, k) + ctrl.shape[1:])
+        if knots is None:
+            knots = np.linspace(0, 1, n + k)
+        windows = np.arange(k - 1, n)[:, None] - (k - 1) + np.arange(k)
+        return np.einsum('sij,sj...->si...', self.cached_bezier_extraction(n, k, knots), ctrl[windows])
+
+    @staticmethod
+    def greville_abscissae(n, k, knots=None):
+        # The parameter each control point is "attached" to: the average of
+        # its k - 1 interior knots. Increasing, so it orders the polygon.
+        if knots is None:
+            knots = np.linspace(0, 1, n + k)
+        knots = np.asarray(knots, dtype=float)
+        if k < 2:
+            return knots[:n].copy()
+        windows = np.arange(n)[:, None] + np.arange(1, k)
+        return knots[windows].mean(axis=1)
+
+    @staticmethod
+    def derivative_control_points(ctrl, k, knots):
+        # The derivative of an order-k B-spline is an order k - 1 B-spline on
+        # knots[1:-1] with control points (k - 1) (P[i+1] - P[i]) / (u[i+k] - u[i+1]).
+        ctrl = np.asarray(ctrl, dtype=float)
+        knots = np.asarray(knots, dtype=float)
+        n = len(ctrl)
+        denom = knots[k:k + n - 1] - knots[1:n]
+        scale = np.divide(k - 1, denom, out=np.zeros(len(denom)), where=denom > 0)
+        return scale.reshape((-1,) + (1,) * (ctrl.ndim - 1)) * np.diff(ctrl, axis=0), k - 1, knots[1:-1]
+
+    def evaluate_derivatives(self, ctrl, k, t_values, knots, max_order=2):
+        # [C, C', ..., C^(max_order)] at t_values; orders at or above k vanish.
+        ctrl = np.asarray(ctrl, dtype=float)
+        result = [self.evaluate(ctrl, k, t_values, knots)]
+        for _ in range(max_order):
+            if k <= 1 or len(ctrl) < 2:
+                result.append(np.zeros_like(result[0]))
+                continue
+            ctrl, k, knots = self.derivative_control_points(ctrl, k, knots)
+            result.append(self.evaluate(ctrl, k, t_values, knots))
+        return result
+
+    def arc_length_table(self, ctrl, k, knots=None):
+        # The table of the last curve is kept, so it is only rebuilt after an
+        # edit. It has its own single slot: in the shared basis cache every
+        # drag would add an entry, and those would push out the basis
+        # matrices. Returns None when the curve cannot be evaluated.
+        ctrl = np.array(ctrl, dtype=float).reshape(-1, 2)
+        n = len(ctrl)
+        if n < k or k < 2:
+            return None
+        if knots is None:
+            knots = np.linspace(0, 1, n + k)
+
+        key = (k, ctrl.tobytes(), np.asarray(knots, dtype=float).tobytes())
+        cached = self._arc_length
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        d_ctrl, d_k, d_knots = self.derivative_control_points(ctrl, k, knots)
+        table = ArcLengthTable(
+            lambda t: speed(self.evaluate_sparse(d_ctrl, *self.sparse_basis(len(d_ctrl), d_k, t, d_knots))),
+            knots[k - 1:n + 1])
+        self._arc_length = (key, table)
+        return table
+
+    @staticmethod
+    def evaluate_sparse(ctrl, cols, weights):
+        return np.einsum('tj,tj...->t...', weights, ctrl[cols])
+
+    def evaluate(self, ctrl, k, t_values, knots):
+        ctrl = np.asarray(ctrl, dtype=float)
+        cols, weights = self.cached_sparse_basis(len(ctrl), k, t_values, knots)
+        return self.evaluate_sparse(ctrl, cols, weights)
+
+    @staticmethod
+    def uniform_parameters(n, k, num_points):
         knots = np.linspace(0, 1, n + k)
 
         start_t = knots[k - 1]
         end_t = knots[n]
         if start_t >= end_t:
-            return []
+            return None
 
-        t_values = np.linspace(start_t, end_t, num_points)
+        return knots, np.linspace(start_t, end_t, num_points)
 
-        spline_points = []
-        for t in t_values:
-            x, y = 0.0, 0.0
-            for i in range(n):
-                basis = BSplineCalculator.basis_function(i, k, t, knots)
-                x += basis * points[i]['x']
-                y += basis * points[i]['y']
-            spline_points.append({'x': x, 'y': y})
+    def sample_parameters(self, ctrl, k, num_points, spacing='parameter'):
+        # (knots, t) like uniform_parameters; with spacing='arc_length' the
+        # samples are equally spaced along the curve instead of in t.
+        params = self.uniform_parameters(len(ctrl), k, num_points)
+        if params is None or spacing == 'parameter':
+            return params
+        knots, _ = params
+        return knots, self.arc_length_table(ctrl, k, knots).uniform_parameters(num_points)
+
+    def compute_bspline(self, points, k, num_points=200, spacing='parameter'):
+        ctrl = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(ctrl)
+        if n < k:
+            return np.empty((0, 2))
+
+        params = self.sample_parameters(ctrl, k, num_points, spacing)
+        if params is None:
+            return np.empty((0, 2))
+        knots, t_values = params
+
+        if spacing != 'parameter':
+            # Arc-length parameters change with every edit; keep them out of
+            # the basis cache.
+            return self.evaluate_sparse(ctrl, *self.sparse_basis(n, k, t_values, knots))
+        return self.evaluate(ctrl, k, t_values, knots)
+
+    def iter_bspline_batch(self, ctrl_batch, k, num_points=200, chunk_size=1024, rational=False):
+        # With rational=True the last coordinate is the weight of each control
+        # point; the curves are evaluated in homogeneous coordinates and projected.
+        ctrl_batch = np.asarray(ctrl_batch, dtype=float)
+        if ctrl_batch.ndim != 3:
+            raise ValueError(f"expected a (batch, n, dim) array, got shape {ctrl_batch.shape}")
+        n = ctrl_batch.shape[1]
+        if n < k:
+            return
+        params = self.uniform_parameters(n, k, num_points)
+        if params is None:
+            return
+        knots, t_values = params
+
+        B = self.cached_basis_matrix(n, k, t_values, knots)
+        for start in range(0, len(ctrl_batch), chunk_size):
+            chunk = ctrl_batch[start:start + chunk_size]
+            if not rational:
+                yield start, np.matmul(B, chunk)
+                continue
+            weights = chunk[..., -1:]
+            homogeneous = np.matmul(B, np.concatenate([chunk[..., :-1] * weights, weights], axis=-1))
+            yield start, homogeneous[..., :-1] / homogeneous[..., -1:]
+
+    def compute_bspline_batch(self, ctrl_batch, k, num_points=200, chunk_size=1024, rational=False, out=None):
+        ctrl_batch = np.asarray(ctrl_batch, dtype=float)
+        dim = ctrl_batch.shape[-1] - 1 if rational else ctrl_batch.shape[-1]
+        if ctrl_batch.ndim == 3 and ctrl_batch.shape[1] < k:
+            return np.empty((ctrl_batch.shape[0], 0, dim))
+        if out is None:
+            out = np.empty((ctrl_batch.shape[0], num_points, dim))
+        for start, curves in self.iter_bspline_batch(ctrl_batch, k, num_points, chunk_size, rational):
+            out[start:start + len(curves)] = curves
+        return out
+
+    def tessellate(self, points, k, tolerance=DEFAULT_TOLERANCE):
+        # Adaptive polyline: the curve is converted to one Bezier segment per
+        # knot span, and each is halved with De Casteljau until its control
+        # polygon is within `tolerance` pixels of the chord.
+        ctrl = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(ctrl)
+        if n < k:
+            return np.empty(0), np.empty((0, 2))
+
+        knots = np.linspace(0, 1, n + k)
+        if knots[k - 1] >= knots[n]:
+            return np.empty(0), np.empty((0, 2))
 
-        return spline_points
+        return flatten_bezier(self.to_bezier(ctrl, k, knots), tolerance, knots[k - 1:n + 1])
@@ -0,0 +1,123 @@
+import numpy as np
+from .spatial_index import UniformGrid
+
+
+class ControlPointStore:
+    # Control points live in one contiguous (n, 2) float64 block. Every point
+    # also gets an integer handle that survives inserts, removals and sorting,
+    # so the UI can keep "the selected point" while rows move around.
+    def __init__(self, points=(), capacity=16, cell_size=20.0):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        capacity = max(capacity, len(points))
+        n = len(points)
+        self._data = np.empty((capacity, 2))
+        self._data[:n] = points
+        self._handles = np.empty(capacity, dtype=np.int64)
+        self._handles[:n] = np.arange(n)
+        self._index_of = np.full(capacity, -1, dtype=np.int64)
+        self._index_of[:n] = np.arange(n)
+        self._count = n
+        self._next_handle = n
+        self._grid = UniformGrid(cell_size)
+        self._grid.insert_many(range(n), points[:, 0], points[:, 1])
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def array(self):
+        return self._data[:self._count]
+
+    @property
+    def handles(self):
+        return self._handles[:self._count]
+
+    def _grow(self, min_capacity):
+        capacity = max(min_capacity, 2 * len(self._data))
+        data = np.empty((capacity, 2))
+        data[:self._count] = self._data[:self._count]
+        handles = np.empty(capacity, dtype=np.int64)
+        handles[:self._count] = self._handles[:self._count]
+        self._data, self._handles = data, handles
+
+    def _new_handle(self, index):
+        handle = self._next_handle
+        self._next_handle += 1
+        if handle >= len(self._index_of):
+            index_of = np.full(max(handle + 1, 2 * len(self._index_of)), -1, dtype=np.int64)
+            index_of[:len(self._index_of)] = self._index_of
+            self._index_of = index_of
+        self._index_of[handle] = index
+        return handle
+
+    def index_of(self, handle):
+        if handle is None or not 0 <= handle < self._next_handle:
+            return -1
+        return int(self._index_of[handle])
+
+    def __contains__(self, handle):
+        return self.index_of(handle) >= 0
+
+    def handle_at(self, index):
+        return int(self._handles[index])
+
+    def _live_index(self, handle):
+        # Removed or unknown handles map to -1, which would silently address
+        # the last row.
+        index = self.index_of(handle)
+        if index < 0:
+            raise KeyError(handle)
+        return index
+
+    def get(self, handle):
+        return self._data[self._live_index(handle)]
+
+    def set(self, handle, x, y):
+        index = self._live_index(handle)
+        self._data[index, 0] = x
+        self._data[index, 1] = y
+        self._grid.move(handle, x, y)
+        return index
+
+    def append(self, x, y):
+        return self.insert(self._count, x, y)
+
+    def insert(self, index, x, y):
+        if self._count == len(self._data):
+            self._grow(self._count + 1)
+        self._data[index + 1:self._count + 1] = self._data[index:self._count]
+        self._handles[index + 1:self._count + 1] = self._handles[index:self._count]
+        self._index_of[self._handles[index + 1:self._count + 1]] += 1
+        self._data[index] = (x, y)
+        handle = self._new_handle(index)
+        self._handles[index] = handle
+        self._grid.insert(handle, x, y)
+        self._count += 1
+        return handle
+
+    def remove(self, handle):
+        index = self._live_index(handle)
+        self._data[index:self._count - 1] = self._data[index + 1:self._count]
+        self._handles[index:self._count - 1] = self._handles[index + 1:self._count]
+        self._index_of[self._handles[index:self._count - 1]] -= 1
+        self._index_of[handle] = -1
+        self._grid.remove(handle)
+        self._count -= 1
+        return index
+
+    def sort_by_x(self):
+        order = np.argsort(self._data[:self._count, 0], kind='stable')
+        self._data[:self._count] = self._data[order]
+        self._handles[:self._count] = self._handles[order]
+        self._index_of[self._handles[:self._count]] = np.arange(self._count)
+
+    def find(self, x, y, radius=10):
+        # Nearest point strictly closer than `radius`, looked up in the grid.
+        candidates = self._grid.candidates(x, y, radius)
+        if not candidates:
+            return None
+        handles = np.array(candidates, dtype=np.int64)
+        points = self._data[self._index_of[handles]]
+        dist_sq = (points[:, 0] - x) ** 2 + (points[:, 1] - y) ** 2
+        best = int(np.argmin(dist_sq))
+        return int(handles[best]) if dist_sq[best] < radius * radius else None
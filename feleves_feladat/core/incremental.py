@@ -0,0 +1,90 @@
+import numpy as np
+from .bspline_calculator import BSplineCalculator
+
+
+class IncrementalBSpline:
+    # A B-spline curve is linear in every control point and P_i only reaches
+    # the samples whose knot span lies in [i, i + k - 1]. When a single point
+    # moves, only those samples get a rank-1 update with the cached basis column.
+    def __init__(self, calculator: BSplineCalculator, num_points=200, resync_every=1000):
+        self.calculator = calculator
+        self.num_points = num_points
+        self.resync_every = resync_every
+        self.curve = np.empty((0, 2))
+        self._ctrl = None
+        self._k = None
+        self._knots = None
+        self._t_values = None
+        self._spans = None
+        self._weights = None
+        self._cols = None
+        self._updates = 0
+
+    @property
+    def t_values(self):
+        return self._t_values
+
+    def _same_layout(self, ctrl, k, t_values, knots):
+        return (self._ctrl is not None and self._ctrl.shape == ctrl.shape and self._k == k
+                and np.array_equal(self._knots, knots) and np.array_equal(self._t_values, t_values))
+
+    def _rebuild(self, ctrl, k, t_values, knots, cache=True):
+        n = len(ctrl)
+        self._ctrl = ctrl.copy()
+        self._k = k
+        self._knots = np.array(knots, dtype=float)
+        self._t_values = np.array(t_values, dtype=float)
+        if cache:
+            self._spans = self.calculator.cached_spans(n, k, t_values, knots)
+            self._cols, self._weights = self.calculator.cached_sparse_basis(n, k, t_values, knots)
+        else:
+            self._spans = self.calculator.find_spans(self._t_values, self._knots)
+            self._cols, self._weights = self.calculator.sparse_basis(n, k, self._t_values, self._knots)
+        self._recompute()
+
+    def _recompute(self):
+        self.curve = self.calculator.evaluate_sparse(self._ctrl, self._cols, self._weights)
+        self._updates = 0
+
+    def affected_samples(self, index):
+        return np.flatnonzero((self._spans >= index) & (self._spans <= index + self._k - 1))
+
+    def update_point(self, index, point):
+        delta = np.asarray(point, dtype=float) - self._ctrl[index]
+        self._ctrl[index] += delta
+        rows = self.affected_samples(index)
+        weights = self._weights[rows, index - (self._spans[rows] - (self._k - 1))]
+        self.curve[rows] += weights[:, None] * delta
+        self._updates += 1
+        if self._updates >= self.resync_every:
+            self._recompute()
+        return rows
+
+    def evaluate(self, ctrl, k, t_values=None, knots=None, cache=True):
+        # cache=False keeps the basis of t_values out of the calculator's
+        # cache, for parameters that change with every edit.
+        ctrl = np.asarray(ctrl, dtype=float).reshape(-1, 2)
+        if t_values is None or knots is None:
+            if len(ctrl) < k:
+                self._ctrl = None
+                return np.empty((0, 2))
+            params = self.calculator.uniform_parameters(len(ctrl), k, self.num_points)
+            if params is None:
+                self._ctrl = None
+                return np.empty((0, 2))
+            knots, t_values = params
+
+        # The result is a copy: self.curve is updated in place by the next
+        # call, and results are handed to other threads.
+        if not self._same_layout(ctrl, k, t_values, knots):
+            self._rebuild(ctrl, k, t_values, knots, cache)
+            return self.curve.copy()
+
+        changed = np.flatnonzero((ctrl != self._ctrl).any(axis=1))
+        if len(changed) * k > len(self._t_values):
+            self._ctrl[:] = ctrl
+            self._recompute()
+        else:
+            for index in changed:
+                self.update_point(index, ctrl[index])
+        return self.curve.copy()
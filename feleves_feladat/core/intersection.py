@@ -0,0 +1,172 @@
+import numpy as np
+
+from .bezier import split_bezier
+from .bspline_calculator import BSplineCalculator
+from .projection import CurveProjector
+from .tessellation import bezier_flatness
+
+FLATNESS = 1e-3
+MAX_DEPTH = 40
+NEWTON_STEPS = 12
+DEFAULT_TOLERANCE = 1e-9
+COINCIDENT_TOLERANCE = 1e-6
+
+
+def bezier_knots(n):
+    # A Bezier curve with n control points is a B-spline of order n on
+    # these knots, so the same machinery handles both.
+    return np.concatenate([np.zeros(n), np.ones(n)])
+
+
+def _overlapping(a, b, margin):
+    return ((a.min(axis=1) <= b.max(axis=1) + margin) & (b.min(axis=1) <= a.max(axis=1) + margin)).all(axis=1)
+
+
+def _chord_parameters(a, b):
+    # Where the chords of two flat segments cross, as fractions of each
+    # chord; parallel chords fall back to their midpoints.
+    p, r = a[:, 0], a[:, -1] - a[:, 0]
+    q, s = b[:, 0], b[:, -1] - b[:, 0]
+    cross = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+    offset = q - p
+    u = np.divide(offset[:, 0] * s[:, 1] - offset[:, 1] * s[:, 0], cross,
+                  out=np.full(len(a), 0.5), where=cross != 0)
+    v = np.divide(offset[:, 0] * r[:, 1] - offset[:, 1] * r[:, 0], cross,
+                  out=np.full(len(a), 0.5), where=cross != 0)
+    return np.clip(u, 0.0, 1.0), np.clip(v, 0.0, 1.0)
+
+
+def candidate_pairs(first, second, flatness=FLATNESS, max_depth=MAX_DEPTH):
+    # Subdivision with convex hull pruning, one whole level at a time: every
+    # pair of Bezier pieces whose control point boxes overlap is halved on
+    # both sides, until both pieces are within `flatness` (relative to the
+    # curves' size) of their chords. Returns start parameters (s, t) from
+    # the chord crossings of the surviving pairs, and the pairs' parameter
+    # intervals (s_lo, s_hi, t_lo, t_hi). A crossing lies in the hulls of
+    # both pieces that contain it, so that pair is never pruned.
+    scale = max(np.ptp(np.concatenate([first.samples, second.samples]), axis=0).max(), 1.0)
+    margin = 1e-9 * scale
+    overlap = ((first.box_min[:, None] <= second.box_max[None] + margin)
+               & (second.box_min[None] <= first.box_max[:, None] + margin)).all(axis=2)
+    i, j = np.nonzero(overlap & (first.widths[:, None] > 0) & (second.widths[None, :] > 0))
+    a, b = first.segments[i], second.segments[j]
+    a_lo, a_hi = first.breakpoints[i], first.breakpoints[i + 1]
+    b_lo, b_hi = second.breakpoints[j], second.breakpoints[j + 1]
+    parts = []
+    for depth in range(max_depth + 1):
+        if len(a) == 0:
+            break
+        keep = _overlapping(a, b, margin)
+        a, b, a_lo, a_hi, b_lo, b_hi = a[keep], b[keep], a_lo[keep], a_hi[keep], b_lo[keep], b_hi[keep]
+        flat = (bezier_flatness(a) <= flatness * scale) & (bezier_flatness(b) <= flatness * scale)
+        if depth == max_depth:
+            flat[:] = True
+        u, v = _chord_parameters(a[flat], b[flat])
+        parts.append((a_lo[flat] + u * (a_hi[flat] - a_lo[flat]), b_lo[flat] + v * (b_hi[flat] - b_lo[flat]),
+                      a_lo[flat], a_hi[flat], b_lo[flat], b_hi[flat]))
+        split = ~flat
+        a_left, a_right = split_bezier(a[split])
+        b_left, b_right = split_bezier(b[split])
+        a_mid = 0.5 * (a_lo[split] + a_hi[split])
+        b_mid = 0.5 * (b_lo[split] + b_hi[split])
+        a = np.concatenate([a_left, a_left, a_right, a_right])
+        b = np.concatenate([b_left, b_right, b_left, b_right])
+        a_lo = np.concatenate([a_lo[split], a_lo[split], a_mid, a_mid])
+        a_hi = np.concatenate([a_mid, a_mid, a_hi[split], a_hi[split]])
+        b_lo = np.concatenate([b_lo[split], b_mid, b_lo[split], b_mid])
+        b_hi = np.concatenate([b_mid, b_hi[split], b_mid, b_hi[split]])
+    if not parts:
+        return tuple(np.empty(0) for _ in range(6))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def refine(first, second, s, t, s_lo, s_hi, t_lo, t_hi, newton_steps=NEWTON_STEPS):
+    # Newton on A(s) - B(t) = 0 for all pairs at once, each clamped to its
+    # pair's intervals: they never straddle a knot, so both curves are one
+    # polynomial there and the iteration cannot bounce across a kink. That
+    # polynomial is used up to and including the interval's right end, which
+    # the plain span lookup would assign to the next span.
+    # Returns (s, t, residual distance).
+    s, t = s.copy(), t.copy()
+    s_span, t_span = first.span_of(0.5 * (s_lo + s_hi)), second.span_of(0.5 * (t_lo + t_hi))
+    active = np.arange(len(s))
+    for _ in range(newton_steps):
+        if len(active) == 0:
+            break
+        a, da, _ = first.evaluate(s[active], s_span[active])
+        b, db, _ = second.evaluate(t[active], t_span[active])
+        f = a - b
+        det = da[:, 1] * db[:, 0] - da[:, 0] * db[:, 1]
+        ds = -np.divide(f[:, 1] * db[:, 0] - f[:, 0] * db[:, 1], det, out=np.zeros(len(active)), where=det != 0)
+        dt = -np.divide(f[:, 1] * da[:, 0] - f[:, 0] * da[:, 1], det, out=np.zeros(len(active)), where=det != 0)
+        new_s = np.clip(s[active] + ds, s_lo[active], s_hi[active])
+        new_t = np.clip(t[active] + dt, t_lo[active], t_hi[active])
+        moving = (np.abs(new_s - s[active]) > 1e-15) | (np.abs(new_t - t[active]) > 1e-15)
+        s[active], t[active] = new_s, new_t
+        active = active[moving]
+    residual = np.linalg.norm(first.evaluate(s, s_span)[0] - second.evaluate(t, t_span)[0], axis=1)
+    return s, t, residual
+
+
+def _unique(s, t, separation):
+    # Several pairs converge to the same crossing; keep one per cluster.
+    order = np.lexsort((t, s))
+    kept = []
+    for index in order.tolist():
+        if not any(abs(s[index] - s[other]) <= separation and abs(t[index] - t[other]) <= separation
+                   for other in kept[-8:]):
+            kept.append(index)
+    return np.array(kept, dtype=np.intp)
+
+
+def intersect_curves(first, second, tolerance=DEFAULT_TOLERANCE, flatness=FLATNESS, max_depth=MAX_DEPTH):
+    # Crossings of two CurveProjector curves. Returns (params, points):
+    # params is (N, 2) with the (s, t) pair of every crossing, sorted by s,
+    # and points the crossing positions on the first curve. Pairs whose
+    # Newton iteration does not bring the curves within `tolerance`
+    # (relative to their size) are not crossings and are dropped. Tangential
+    # contacts may be missed, and curves that coincide along a stretch
+    # report scattered points of the overlap; identical curves are caught
+    # earlier, by intersect().
+    if not (first.valid and second.valid):
+        return np.empty((0, 2)), np.empty((0, 2))
+    candidates = candidate_pairs(first, second, flatness, max_depth)
+    if len(candidates[0]) == 0:
+        return np.empty((0, 2)), np.empty((0, 2))
+    s, t, residual = refine(first, second, *candidates)
+    scale = max(np.ptp(np.concatenate([first.samples, second.samples]), axis=0).max(), 1.0)
+    hit = residual <= tolerance * scale
+    s, t = s[hit], t[hit]
+    if len(s) == 0:
+        return np.empty((0, 2)), np.empty((0, 2))
+    kept = _unique(s, t, 1e3 * tolerance)
+    params = np.column_stack([s[kept], t[kept]])
+    return params, first.evaluate(params[:, 0])[0]
+
+
+def coincident(ctrl_a, k_a, ctrl_b, k_b, knots_a=None, knots_b=None, tolerance=COINCIDENT_TOLERANCE):
+    # Whether two B-splines are the same curve: same order and knots, and
+    # control points equal within `tolerance` relative to the polygon's size
+    # (a least squares refit of a curve on its own layout is not exact).
+    ctrl_a = np.asarray(ctrl_a, dtype=float).reshape(-1, 2)
+    ctrl_b = np.asarray(ctrl_b, dtype=float).reshape(-1, 2)
+    if k_a != k_b or ctrl_a.shape != ctrl_b.shape or len(ctrl_a) == 0:
+        return False
+    knots_a = np.linspace(0, 1, len(ctrl_a) + k_a) if knots_a is None else np.asarray(knots_a, dtype=float)
+    knots_b = np.linspace(0, 1, len(ctrl_b) + k_b) if knots_b is None else np.asarray(knots_b, dtype=float)
+    if knots_a.shape != knots_b.shape or not np.allclose(knots_a, knots_b, rtol=0, atol=tolerance):
+        return False
+    scale = max(np.ptp(ctrl_a, axis=0).max(), 1.0)
+    return bool(np.abs(ctrl_a - ctrl_b).max() <= tolerance * scale)
+
+
+def intersect(ctrl_a, k_a, ctrl_b, k_b, knots_a=None, knots_b=None, tolerance=DEFAULT_TOLERANCE, calculator=None):
+    # Crossings of two B-splines (uniform knots unless given); for Bezier
+    # curves pass k = len(ctrl) and bezier_knots(len(ctrl)). A curve has no
+    # crossings with itself: subdivision would report points all along it.
+    if coincident(ctrl_a, k_a, ctrl_b, k_b, knots_a, knots_b):
+        return np.empty((0, 2)), np.empty((0, 2))
+    calculator = calculator if calculator is not None else BSplineCalculator()
+    first = CurveProjector(ctrl_a, k_a, knots_a, calculator=calculator)
+    second = CurveProjector(ctrl_b, k_b, knots_b, calculator=calculator)
+    return intersect_curves(first, second, tolerance)
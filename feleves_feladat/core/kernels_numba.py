@@ -0,0 +1,145 @@
+from math import comb
+
+import numpy as np
+from numba import njit
+
+# The same kernel set as kernels_numpy, written as per-sample loops and
+# compiled on first use in every process. There is no on-disk cache: it
+# records the module's import path, and this module is imported both as
+# core.kernels_numba (main.py) and as feleves_feladat.core.kernels_numba
+# (scripts, benchmarks), so a cache written by one fails to load in the
+# other. Loops over one sample at a time keep the working set in
+# registers, so small batches do not pay for allocating and sweeping whole
+# temporary arrays.
+
+
+@njit
+def _find_spans(t_values, knots):
+    # searchsorted(knots, t, 'right') - 1 by bisection, -1 outside the knots.
+    last = len(knots) - 1
+    spans = np.empty(len(t_values), dtype=np.intp)
+    for p in range(len(t_values)):
+        t = t_values[p]
+        low, high = 0, len(knots)
+        while low < high:
+            middle = (low + high) // 2
+            if knots[middle] <= t:
+                low = middle + 1
+            else:
+                high = middle
+        span = low - 1
+        spans[p] = span if 0 <= span < last else -1
+    return spans
+
+
+@njit
+def _basis_values(k, t_values, knots, spans):
+    # Knot indices outside the vector are clamped to its ends, as np.pad
+    # with mode='edge' does in the NumPy kernel.
+    count = len(t_values)
+    last = len(knots) - 1
+    values = np.zeros((count, k))
+    left = np.zeros(k)
+    right = np.zeros(k)
+    for p in range(count):
+        span = spans[p]
+        if span < 0:
+            continue
+        t = t_values[p]
+        values[p, 0] = 1.0
+        for j in range(1, k):
+            left[j] = t - knots[max(span + 1 - j, 0)]
+            right[j] = knots[min(span + j, last)] - t
+            saved = 0.0
+            for r in range(j):
+                denom = right[r + 1] + left[j - r]
+                temp = values[p, r] / denom if denom != 0.0 else 0.0
+                values[p, r] = saved + right[r + 1] * temp
+                saved = left[j - r] * temp
+            values[p, j] = saved
+    return values
+
+
+def find_spans(t_values, knots):
+    return _find_spans(np.ascontiguousarray(t_values, dtype=float), np.ascontiguousarray(knots, dtype=float))
+
+
+def nonzero_basis(k, t_values, knots):
+    t_values = np.ascontiguousarray(t_values, dtype=float)
+    knots = np.ascontiguousarray(knots, dtype=float)
+    spans = _find_spans(t_values, knots)
+    return spans, _basis_values(k, t_values, knots, spans)
+
+
+@njit
+def _de_casteljau(ctrl, t_values):
+    n, dim = ctrl.shape
+    result = np.empty((len(t_values), dim))
+    work = np.empty((n, dim))
+    for p in range(len(t_values)):
+        t = t_values[p]
+        work[:] = ctrl
+        for m in range(n - 1, 0, -1):
+            for i in range(m):
+                for c in range(dim):
+                    work[i, c] += t * (work[i + 1, c] - work[i, c])
+        result[p] = work[0]
+    return result
+
+
+def de_casteljau_points(ctrl, t_values):
+    ctrl = np.asarray(ctrl, dtype=float)
+    flat = np.ascontiguousarray(ctrl.reshape(len(ctrl), -1))
+    result = _de_casteljau(flat, np.ascontiguousarray(t_values, dtype=float))
+    return result.reshape((len(result),) + ctrl.shape[1:])
+
+
+@njit
+def _bernstein(coefficients, t_values):
+    degree = len(coefficients) - 1
+    result = np.empty((len(t_values), degree + 1))
+    for p in range(len(t_values)):
+        t = t_values[p]
+        for i in range(degree + 1):
+            result[p, i] = coefficients[i] * t ** i * (1.0 - t) ** (degree - i)
+    return result
+
+
+def bernstein_matrix(degree, t_values):
+    coefficients = np.array([comb(degree, j) for j in range(degree + 1)], dtype=float)
+    return _bernstein(coefficients, np.ascontiguousarray(t_values, dtype=float))
+
+
+@njit
+def _barycentric(nodes, weights, values, t_values):
+    n, dim = values.shape
+    result = np.empty((len(t_values), dim))
+    numerator = np.empty(dim)
+    for p in range(len(t_values)):
+        t = t_values[p]
+        exact = -1
+        denominator = 0.0
+        numerator[:] = 0.0
+        for j in range(n):
+            diff = t - nodes[j]
+            if diff == 0.0:
+                exact = j
+                break
+            term = weights[j] / diff
+            denominator += term
+            for c in range(dim):
+                numerator[c] += term * values[j, c]
+        if exact >= 0:
+            result[p] = values[exact]
+        else:
+            for c in range(dim):
+                result[p, c] = numerator[c] / denominator
+    return result
+
+
+def barycentric_evaluate(nodes, weights, values, t_values):
+    values = np.asarray(values, dtype=float)
+    flat = np.ascontiguousarray(values.reshape(len(values), -1))
+    result = _barycentric(np.ascontiguousarray(nodes, dtype=float), np.ascontiguousarray(weights, dtype=float),
+                          flat, np.ascontiguousarray(t_values, dtype=float))
+    return result.reshape((len(result),) + values.shape[1:])
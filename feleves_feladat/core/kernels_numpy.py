@@ -0,0 +1,73 @@
+from math import comb
+
+import numpy as np
+
+# Reference kernel set: whole-array NumPy, no per-sample Python loops.
+
+
+def find_spans(t_values, knots):
+    # Half-open rule knots[s] <= t < knots[s + 1]; parameters outside
+    # [knots[0], knots[-1]) get -1.
+    t_values = np.asarray(t_values, dtype=float)
+    knots = np.asarray(knots, dtype=float)
+    spans = np.searchsorted(knots, t_values, side='right') - 1
+    spans[(spans < 0) | (spans >= len(knots) - 1)] = -1
+    return spans
+
+
+def nonzero_basis(k, t_values, knots):
+    # Triangular de Boor recurrence: for every t only the k basis functions
+    # N_{s-k+1..s, k} of its span s can be nonzero.
+    t_values = np.asarray(t_values, dtype=float)
+    knots = np.asarray(knots, dtype=float)
+    spans = find_spans(t_values, knots)
+    degree = k - 1
+    padded = np.pad(knots, degree, mode='edge')
+    span_idx = np.where(spans < 0, 0, spans) + degree
+
+    values = np.zeros((len(t_values), k))
+    values[:, 0] = 1.0
+    left = np.zeros((len(t_values), k))
+    right = np.zeros((len(t_values), k))
+    for j in range(1, k):
+        left[:, j] = t_values - padded[span_idx + 1 - j]
+        right[:, j] = padded[span_idx + j] - t_values
+        saved = np.zeros(len(t_values))
+        for r in range(j):
+            denom = right[:, r + 1] + left[:, j - r]
+            temp = np.divide(values[:, r], denom, out=np.zeros(len(t_values)), where=denom != 0)
+            values[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        values[:, j] = saved
+    values[spans < 0] = 0.0
+    return spans, values
+
+
+def de_casteljau_points(ctrl, t_values):
+    # The reduction for all parameters at once on a (T, n, dim) tensor.
+    ctrl = np.asarray(ctrl, dtype=float)
+    t = np.asarray(t_values, dtype=float)[:, None, None]
+    points = np.array(np.broadcast_to(ctrl, (t.shape[0],) + ctrl.shape))
+    for m in range(len(ctrl) - 1, 0, -1):
+        points[:, :m] += t * (points[:, 1:m + 1] - points[:, :m])
+    return points[:, 0]
+
+
+def bernstein_matrix(degree, t_values):
+    t = np.asarray(t_values, dtype=float)[:, None]
+    i = np.arange(degree + 1)
+    coefficients = np.array([comb(degree, j) for j in i], dtype=float)
+    return coefficients * t ** i * (1 - t) ** (degree - i)
+
+
+def barycentric_evaluate(nodes, weights, values, t_values):
+    # Second barycentric formula at 1-D t_values; values is (n, ...).
+    t = np.asarray(t_values, dtype=float)
+    diff = t[:, None] - nodes[None, :]
+    exact = diff == 0
+    diff[exact] = 1.0
+    terms = weights / diff
+    result = np.tensordot(terms, values, axes=1) / terms.sum(axis=1).reshape((-1,) + (1,) * (values.ndim - 1))
+    rows, cols = np.nonzero(exact)
+    result[rows] = values[cols]
+    return result
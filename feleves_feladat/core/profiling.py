@@ -0,0 +1,134 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+DEFAULT_WINDOW = 240
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class FrameProfiler:
+    # Named per-frame timers. While disabled, stage() hands back one shared
+    # no-op context manager, so instrumented code costs a method call and an
+    # attribute test per stage. Times are stored in seconds; a stage entered
+    # several times in one frame accumulates.
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW, record=False):
+        self.enabled = enabled
+        self.record = record
+        self.history = deque(maxlen=window)
+        self.trace = []
+        self.stage_names = []
+        self._current = None
+        self._frame_start = None
+        self._origin = None
+        self._frame_index = 0
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        if self._current is None:
+            return
+        if name not in self._current:
+            self._current[name] = 0.0
+            if name not in self.stage_names:
+                self.stage_names.append(name)
+        self._current[name] += seconds
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = perf_counter()
+        if self._origin is None:
+            self._origin = self._frame_start
+        self._current = {}
+
+    def end_frame(self):
+        if self._current is None:
+            return
+        frame = self._current
+        frame['frame'] = perf_counter() - self._frame_start
+        self.history.append(frame)
+        if self.record:
+            self.trace.append((self._frame_index, self._frame_start - self._origin, frame))
+        self._frame_index += 1
+        self._current = None
+
+    def reset(self):
+        self.history.clear()
+        self.trace.clear()
+        self.stage_names.clear()
+        self._current = None
+        self._origin = None
+        self._frame_index = 0
+
+    def stage_percentiles(self, name, percentiles=DEFAULT_PERCENTILES):
+        # Frames in which the stage did not run count as zero, so rare but
+        # expensive stages show up in the high percentiles only.
+        if not self.history:
+            return np.zeros(len(percentiles))
+        values = np.fromiter((frame.get(name, 0.0) for frame in self.history), dtype=float,
+                             count=len(self.history))
+        return np.percentile(values, percentiles)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        return {name: self.stage_percentiles(name, percentiles)
+                for name in ['frame'] + self.stage_names}
+
+    def summary_lines(self, percentiles=DEFAULT_PERCENTILES):
+        header = f"{'stage (ms)':<18}" + ''.join(f'{f"p{p}":>8}' for p in percentiles)
+        lines = [header]
+        for name, values in self.summary(percentiles).items():
+            lines.append(f'{name:<18}' + ''.join(f'{value * 1000:8.2f}' for value in values))
+        return lines
+
+    def export(self, path):
+        # The format follows the file extension: .csv gives one row per frame
+        # and one column per stage (milliseconds), anything else JSON.
+        columns = ['frame'] + self.stage_names
+        if str(path).lower().endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['index', 'start_s'] + [name + '_ms' for name in columns])
+                for index, start, frame in self.trace:
+                    writer.writerow([index, f'{start:.6f}'] +
+                                    [f'{frame.get(name, 0.0) * 1000:.4f}' for name in columns])
+            return
+        frames = [{'index': index, 'start_s': start,
+                   'stages_ms': {name: seconds * 1000 for name, seconds in frame.items()}}
+                  for index, start, frame in self.trace]
+        with open(path, 'w') as f:
+            json.dump({'stages': columns, 'frames': frames}, f, indent=1)
@@ -0,0 +1,286 @@
+from math import comb
+
+import numpy as np
+
+from .bezier import power_coefficients, split_bezier
+from .bspline_calculator import BSplineCalculator
+
+DEFAULT_SAMPLES_PER_SPAN = 16
+NEWTON_STEPS = 8
+SUBDIVISIONS = 4
+QUERY_CHUNK = 512
+
+
+def _brute_force_nearest(samples):
+    squared = np.einsum('ij,ij->i', samples, samples)
+
+    def nearest(queries):
+        result = np.empty(len(queries), dtype=np.intp)
+        for start in range(0, len(queries), QUERY_CHUNK):
+            chunk = queries[start:start + QUERY_CHUNK]
+            result[start:start + len(chunk)] = np.argmin(squared - 2.0 * chunk @ samples.T, axis=1)
+        return result
+
+    return nearest
+
+
+def nearest_sample_index(samples):
+    # Returns a callable mapping (m, dim) queries to the index of the nearest
+    # sample: a k-d tree when SciPy is available, chunked brute force if not.
+    samples = np.ascontiguousarray(samples, dtype=float)
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return _brute_force_nearest(samples)
+    tree = cKDTree(samples)
+    return lambda queries: tree.query(queries)[1]
+
+
+def derivative_product_weights(k):
+    # Row j * (k - 1) + l takes the product B_j^d * B_l^(d-1) (d = k - 1) to
+    # the Bernstein basis of degree 2d - 1, where (C - q) . C' lives.
+    degree = k - 1
+    weights = np.zeros((k, k - 1, 2 * degree))
+    for j in range(k):
+        for l in range(k - 1):
+            weights[j, l, j + l] = comb(degree, j) * comb(degree - 1, l) / comb(2 * degree - 1, j + l)
+    return weights.reshape(k * (k - 1), 2 * degree)
+
+
+class CurveProjector:
+    # Closest points on one B-spline curve for a batch of query points. Each
+    # knot span is converted once per edit to a polynomial (Bezier extraction
+    # to the power basis), so C, C' and C'' at any t are one Horner pass.
+    # The nearest dense sample bounds each query's distance from above. Then
+    # branch and bound on the Bezier pieces: a piece's control polygon box
+    # contains its part of the curve and its end control points lie on the
+    # curve, so pieces whose box is farther than the best end point so far
+    # are dropped. The sign changes of (C - q) . C' in Bernstein form bound
+    # its roots on the piece: with none, or one from + to -, the minimum is
+    # at an end point and the piece is dropped; one from - to + leaves a
+    # single minimum, found by bracketed Newton steps; only pieces with more
+    # are halved, SUBDIVISIONS times, and then refined by plain Newton steps
+    # clamped to the piece. All pieces are refined at once, each on its
+    # span's polynomial, and the closest result wins: the global minimum up
+    # to Newton's tolerance, not just a local one.
+    def __init__(self, ctrl, k, knots=None, samples_per_span=DEFAULT_SAMPLES_PER_SPAN, calculator=None):
+        self.calculator = calculator if calculator is not None else BSplineCalculator()
+        ctrl = np.array(ctrl, dtype=float).reshape(-1, 2)
+        n = len(ctrl)
+        self.k = k
+        self.knots = np.linspace(0, 1, n + k) if knots is None else np.asarray(knots, dtype=float)
+        self.valid = n >= k >= 2
+        if not self.valid:
+            self.sample_t = np.empty(0)
+            self.samples = np.empty((0, 2))
+            return
+        self.breakpoints = self.knots[k - 1:n + 1]
+        self.t_start, self.t_end = self.breakpoints[0], self.breakpoints[-1]
+        self.widths = np.diff(self.breakpoints)
+        self.segments = self.calculator.to_bezier(ctrl, k, self.knots)
+        self.box_min, self.box_max = self.segments.min(axis=1), self.segments.max(axis=1)
+        self.coefficients = power_coefficients(self.segments)
+        self.product_weights = derivative_product_weights(k)
+        self.samples_per_span = samples_per_span
+        u = np.linspace(0.0, 1.0, samples_per_span + 1)
+        self.span_samples = np.einsum('uj,sjd->sud', u[:, None] ** np.arange(k), self.coefficients)
+        nonempty = self.widths > 0
+        span_t = self.breakpoints[:-1, None] + u[:-1] * self.widths[:, None]
+        self.sample_t = np.append(span_t[nonempty].ravel(), self.t_end)
+        self.samples = np.concatenate([self.span_samples[nonempty, :-1].reshape(-1, 2), self.span_samples[-1, -1:]])
+        self._nearest = None
+
+    def span_of(self, t_values):
+        return np.clip(np.searchsorted(self.breakpoints, t_values, side='right') - 1, 0, len(self.widths) - 1)
+
+    def evaluate(self, t_values, span=None):
+        # (C, C', C'') at t_values, each (m, 2). By default each t uses the
+        # polynomial of the span containing it, so t on a breakpoint takes the
+        # next span's; passing `span` evaluates that span's polynomial on its
+        # closed interval, right end included.
+        t_values = np.asarray(t_values, dtype=float)
+        span = self.span_of(t_values) if span is None else np.asarray(span)
+        width = self.widths[span]
+        u = np.divide(t_values - self.breakpoints[span], width, out=np.zeros(len(t_values)), where=width > 0)
+        coefficients = self.coefficients[span]
+        u = u[:, None]
+        value = coefficients[:, -1]
+        first = np.zeros_like(value)
+        second = np.zeros_like(value)
+        for j in range(self.k - 2, -1, -1):
+            second = second * u + first
+            first = first * u + value
+            value = value * u + coefficients[:, j]
+        scale = np.divide(1.0, width, out=np.zeros(len(t_values)), where=width > 0)[:, None]
+        return value, first * scale, 2.0 * second * scale * scale
+
+    def _nearest_samples(self, queries):
+        if self._nearest is None:
+            self._nearest = nearest_sample_index(self.samples)
+        index = self._nearest(queries)
+        return self.sample_t[index], self.samples[index].copy(), np.linalg.norm(self.samples[index] - queries, axis=1)
+
+    def _newton(self, queries, t, low, high, newton_steps, tolerance, span=None, bracketed=None):
+        # Minimizes |C(t) - q|^2 for every query within [low, high], on the
+        # given span's polynomial when `span` is set. Only
+        # queries that are still moving take further steps; where the
+        # distance is not locally convex the step falls back to Gauss-Newton
+        # (the |C'|^2 part of the second derivative). Where `bracketed` is
+        # set the derivative is known to change sign once, from - to +, in
+        # [low, high]: the interval shrinks around the root and a step that
+        # leaves it bisects instead. A query that ends farther away than it
+        # started keeps its start.
+        start_t = t
+        t = t.copy()
+        if bracketed is not None:
+            low, high = low.copy(), high.copy()
+        start_distance = None
+        active = np.arange(len(queries))
+        for _ in range(newton_steps):
+            value, first, second = self.evaluate(t[active], None if span is None else span[active])
+            diff = value - queries[active]
+            if start_distance is None:
+                start_distance = np.linalg.norm(diff, axis=1)
+            gradient = np.einsum('ij,ij->i', diff, first)
+            gauss_newton = np.einsum('ij,ij->i', first, first)
+            hessian = gauss_newton + np.einsum('ij,ij->i', diff, second)
+            hessian = np.where(hessian > 0, hessian, gauss_newton)
+            step = np.divide(gradient, hessian, out=np.zeros(len(active)), where=hessian > 0)
+            current = t[active]
+            if bracketed is not None:
+                inside = bracketed[active]
+                low[active] = np.where(inside & (gradient < 0), current, low[active])
+                high[active] = np.where(inside & (gradient > 0), current, high[active])
+            new_t = np.clip(current - step, low[active], high[active])
+            if bracketed is not None:
+                bisect = inside & (np.abs(step) > tolerance) & ((new_t <= low[active]) | (new_t >= high[active]))
+                new_t[bisect] = 0.5 * (low[active][bisect] + high[active][bisect])
+            moving = np.abs(new_t - current) > tolerance
+            t[active] = new_t
+            active = active[moving]
+            if len(active) == 0:
+                break
+        points = self.evaluate(t, span)[0]
+        distances = np.linalg.norm(points - queries, axis=1)
+        if start_distance is not None:
+            worse = distances > start_distance
+            if worse.any():
+                t[worse] = start_t[worse]
+                points[worse] = self.evaluate(start_t[worse], None if span is None else span[worse])[0]
+                distances[worse] = start_distance[worse]
+        return t, points, distances
+
+    def _derivative_signs(self, pieces, targets):
+        # Sign changes of (C(u) - q) . C'(u) on every piece, read off its
+        # Bernstein coefficients (zeros skipped), whether the last nonzero
+        # one is positive, and where the coefficient polygon first crosses
+        # zero, as a fraction of the piece: a start for Newton.
+        offsets = pieces - targets[:, None]
+        tangents = np.diff(pieces, axis=1)
+        products = offsets[:, :, None, 0] * tangents[:, None, :, 0] + offsets[:, :, None, 1] * tangents[:, None, :, 1]
+        coefficients = products.reshape(len(pieces), len(self.product_weights)) @ self.product_weights
+        signs = np.sign(coefficients)
+        count = signs.shape[1]
+        last = np.maximum.accumulate(np.where(signs != 0, np.arange(count), 0), axis=1)
+        signs = np.take_along_axis(signs, last, axis=1)
+        change = signs[:, 1:] * signs[:, :-1] < 0
+        first = np.argmax(change, axis=1)
+        rows = np.arange(len(pieces))
+        before, after = coefficients[rows, first], coefficients[rows, first + 1]
+        fraction = np.divide(before, before - after, out=np.full(len(pieces), 0.5), where=before != after)
+        start = (first + np.clip(fraction, 0.0, 1.0)) / (count - 1)
+        return change.sum(axis=1), signs[:, -1] > 0, start
+
+    def _box_distances_sq(self, queries):
+        squared = 0.0
+        for axis in range(2):
+            q = queries[:, axis, None]
+            gap = np.maximum(np.maximum(self.box_min[None, :, axis] - q, q - self.box_max[None, :, axis]), 0.0)
+            squared = squared + gap * gap
+        return squared
+
+    def _candidates(self, queries, bound):
+        # (query, span) pairs whose span box is within the query's bound.
+        pairs = []
+        for start in range(0, len(queries), QUERY_CHUNK):
+            stop = min(start + QUERY_CHUNK, len(queries))
+            lower = self._box_distances_sq(queries[start:stop])
+            lower[:, self.widths <= 0] = np.inf
+            query, span = np.nonzero(lower <= bound[start:stop, None] ** 2)
+            pairs.append((query + start, span))
+        return np.concatenate([pair[0] for pair in pairs]), np.concatenate([pair[1] for pair in pairs])
+
+    def project(self, queries, newton_steps=NEWTON_STEPS, tolerance=1e-12):
+        # Returns (t, closest points, distances) for an (m, 2) array.
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        if not self.valid or len(queries) == 0:
+            return np.empty(0), np.empty((0, 2)), np.empty(0)
+        t, points, distances = self._nearest_samples(queries)
+        query, span = self._candidates(queries, distances)
+        pieces, low, high = self.segments[span], self.breakpoints[span], self.breakpoints[span + 1]
+        bound = distances.copy()
+        leaves = []
+        for depth in range(SUBDIVISIONS + 1):
+            if len(query) == 0:
+                break
+            if depth:
+                left, right = split_bezier(pieces)
+                middle = 0.5 * (low + high)
+                query, span = np.concatenate([query, query]), np.concatenate([span, span])
+                pieces = np.concatenate([left, right])
+                low, high = np.concatenate([low, middle]), np.concatenate([middle, high])
+            targets = queries[query]
+            for end in (0, -1):
+                offset = pieces[:, end] - targets
+                np.minimum.at(bound, query, np.sqrt(np.einsum('ij,ij->i', offset, offset)))
+            # Folding over the few control points beats min/max along axis 1.
+            box_min, box_max = pieces[:, 0], pieces[:, 0]
+            for j in range(1, pieces.shape[1]):
+                box_min, box_max = np.minimum(box_min, pieces[:, j]), np.maximum(box_max, pieces[:, j])
+            gap = np.maximum(np.maximum(box_min - targets, targets - box_max), 0.0)
+            keep = np.einsum('ij,ij->i', gap, gap) <= bound[query] ** 2
+            query, span, pieces, low, high = query[keep], span[keep], pieces[keep], low[keep], high[keep]
+            changes, rising, start = self._derivative_signs(pieces, queries[query])
+            single = (changes == 1) & rising
+            leaves.append((query[single], span[single], low[single] + start[single] * (high[single] - low[single]),
+                           low[single], high[single], np.ones(single.sum(), dtype=bool)))
+            several = changes > 1
+            query, span, pieces, low, high = query[several], span[several], pieces[several], low[several], high[several]
+        leaves.append((query, span, 0.5 * (low + high), low, high, np.zeros(len(query), dtype=bool)))
+        query, span, start_t, low, high, bracketed = (np.concatenate(column) for column in zip(*leaves))
+        if len(query) == 0:
+            return t, points, distances
+        piece_t, piece_points, piece_distances = self._newton(queries[query], start_t, low, high,
+                                                              newton_steps, tolerance, span, bracketed)
+        order = np.argsort(-piece_distances)
+        query, piece_t, piece_points, piece_distances = (query[order], piece_t[order], piece_points[order],
+                                                         piece_distances[order])
+        # Repeated indices keep the last, i.e. the closest, assignment.
+        better = piece_distances < distances[query]
+        query = query[better]
+        t[query] = piece_t[better]
+        points[query] = piece_points[better]
+        distances[query] = piece_distances[better]
+        return t, points, distances
+
+
+def directed_hausdorff(source, target):
+    # Largest distance from the samples of projector `source` to the curve of
+    # projector `target`, with the parameters where it is attained.
+    if not (source.valid and target.valid):
+        return 0.0, None, None
+    t, _, distances = target.project(source.samples)
+    i = int(np.argmax(distances))
+    return float(distances[i]), float(source.sample_t[i]), float(t[i])
+
+
+def hausdorff_distance(ctrl_a, k_a, ctrl_b, k_b, samples_per_span=DEFAULT_SAMPLES_PER_SPAN, calculator=None):
+    # One-sided distances in both directions and their maximum, the
+    # symmetric Hausdorff distance, measured at samples of each curve.
+    calculator = calculator if calculator is not None else BSplineCalculator()
+    a = CurveProjector(ctrl_a, k_a, samples_per_span=samples_per_span, calculator=calculator)
+    b = CurveProjector(ctrl_b, k_b, samples_per_span=samples_per_span, calculator=calculator)
+    a_to_b = directed_hausdorff(a, b)
+    b_to_a = directed_hausdorff(b, a)
+    return {'a_to_b': a_to_b[0], 'b_to_a': b_to_a[0], 'hausdorff': max(a_to_b[0], b_to_a[0]),
+            'a_to_b_at': a_to_b[1:], 'b_to_a_at': b_to_a[1:]}
@@ -0,0 +1,217 @@
+import heapq
+from math import floor
+
+import numpy as np
+
+
+class UniformGrid:
+    # Hashes points into square cells. Insert, move and remove are O(1), and
+    # a query only looks at the cells its radius overlaps, so picking cost does
+    # not grow with the number of points.
+    def __init__(self, cell_size=20.0):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._cell_of = {}
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def _cell(self, x, y):
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def insert(self, key, x, y):
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, set()).add(key)
+        self._cell_of[key] = cell
+
+    def insert_many(self, keys, xs, ys):
+        cells_x = np.floor(np.asarray(xs, dtype=float) / self.cell_size).astype(np.int64).tolist()
+        cells_y = np.floor(np.asarray(ys, dtype=float) / self.cell_size).astype(np.int64).tolist()
+        for key, cell in zip(keys, zip(cells_x, cells_y)):
+            self._cells.setdefault(cell, set()).add(key)
+            self._cell_of[key] = cell
+
+    def remove(self, key):
+        cell = self._cell_of.pop(key, None)
+        if cell is None:
+            return
+        members = self._cells[cell]
+        members.discard(key)
+        if not members:
+            del self._cells[cell]
+
+    def move(self, key, x, y):
+        # Keys the grid does not hold are ignored, never re-inserted.
+        cell = self._cell_of.get(key)
+        if cell is None or cell == self._cell(x, y):
+            return
+        self.remove(key)
+        self.insert(key, x, y)
+
+    def clear(self):
+        self._cells.clear()
+        self._cell_of.clear()
+
+    def candidates(self, x, y, radius):
+        x0, y0 = self._cell(x - radius, y - radius)
+        x1, y1 = self._cell(x + radius, y + radius)
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                members = self._cells.get((cx, cy))
+                if members:
+                    found.extend(members)
+        return found
+
+
+class SegmentBVH:
+    # Bounding boxes over the segments of a polyline (an evaluated or
+    # tessellated curve), kept as an implicit complete binary tree: leaf i is
+    # node size + i and node j bounds its children 2j and 2j + 1. The
+    # segments are not reordered: consecutive pieces of a curve are already
+    # close together, so the boxes stay tight, and after an edit only the
+    # changed leaves and their ancestors are refitted.
+    def __init__(self, points=(), t_values=None):
+        self.build(points, t_values)
+
+    def __len__(self):
+        return self._count
+
+    def build(self, points, t_values=None):
+        self.points = np.array(points, dtype=float).reshape(-1, 2)
+        self.t_values = (np.arange(len(self.points), dtype=float) if t_values is None
+                         else np.array(t_values, dtype=float))
+        self._count = max(len(self.points) - 1, 0)
+        self._size = 1 << max(self._count - 1, 0).bit_length()
+        self._boxes = []
+        self.box_min = np.full((2 * self._size, 2), np.inf)
+        self.box_max = np.full((2 * self._size, 2), -np.inf)
+        self._refit(np.arange(self._count))
+
+    def update(self, points, t_values=None):
+        # Refits the boxes of the segments whose end points moved; a new
+        # point count or new parameters mean a rebuild. Returns the number of
+        # refitted segments.
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if points.shape != self.points.shape or (t_values is not None
+                                                 and not np.array_equal(t_values, self.t_values)):
+            self.build(points, t_values)
+            return self._count
+        moved = np.flatnonzero((points != self.points).any(axis=1))
+        if len(moved) == 0:
+            return 0
+        self.points[moved] = points[moved]
+        # A point bounds the segment ending and the segment starting at it.
+        segments = np.unique(np.concatenate([moved - 1, moved]))
+        segments = segments[(segments >= 0) & (segments < self._count)]
+        self._refit(segments)
+        return len(segments)
+
+    def _refit(self, segments):
+        # Refits the given sorted, distinct segments and their ancestors,
+        # level by level, each ancestor once.
+        if len(segments) == 0:
+            return
+        nodes = self._size + segments
+        self.box_min[nodes] = np.minimum(self.points[segments], self.points[segments + 1])
+        self.box_max[nodes] = np.maximum(self.points[segments], self.points[segments + 1])
+        levels = [nodes]
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self.box_min[nodes] = np.minimum(self.box_min[2 * nodes], self.box_min[2 * nodes + 1])
+            self.box_max[nodes] = np.maximum(self.box_max[2 * nodes], self.box_max[2 * nodes + 1])
+            levels.append(nodes)
+        # The traversal reads the boxes as Python floats: indexing lists is
+        # much cheaper than indexing an array one scalar at a time.
+        if len(segments) == self._count:
+            self._boxes = np.hstack([self.box_min, self.box_max]).tolist()
+            return
+        for nodes in levels:
+            for node, box in zip(nodes.tolist(), np.hstack([self.box_min[nodes], self.box_max[nodes]]).tolist()):
+                self._boxes[node] = box
+
+    @staticmethod
+    def _box_distance_sq(box, x, y):
+        dx = max(box[0] - x, 0.0, x - box[2])
+        dy = max(box[1] - y, 0.0, y - box[3])
+        return dx * dx + dy * dy
+
+    def nearest(self, x, y, max_distance=np.inf):
+        # Closest point of the polyline to (x, y), searched best-first over
+        # the boxes. Returns (distance, t, (px, py), segment), with t
+        # interpolated along the segment, or None when nothing lies within
+        # max_distance.
+        if self._count == 0:
+            return None
+        boxes = self._boxes
+        best_sq = max_distance * max_distance
+        best = None
+        heap = [(self._box_distance_sq(boxes[1], x, y), 1)]
+        while heap:
+            distance_sq, node = heapq.heappop(heap)
+            if distance_sq >= best_sq:
+                break
+            if node >= self._size:
+                segment = node - self._size
+                ax, ay = self.points[segment].tolist()
+                bx, by = self.points[segment + 1].tolist()
+                dx, dy = bx - ax, by - ay
+                length_sq = dx * dx + dy * dy
+                u = 0.0 if length_sq == 0 else min(max(((x - ax) * dx + (y - ay) * dy) / length_sq, 0.0), 1.0)
+                px, py = ax + u * dx, ay + u * dy
+                candidate_sq = (px - x) ** 2 + (py - y) ** 2
+                if candidate_sq < best_sq:
+                    best_sq = candidate_sq
+                    best = (segment, u, (px, py))
+                continue
+            for child in (2 * node, 2 * node + 1):
+                box = boxes[child]
+                if box[0] <= box[2]:
+                    child_sq = self._box_distance_sq(box, x, y)
+                    if child_sq < best_sq:
+                        heapq.heappush(heap, (child_sq, child))
+        if best is None:
+            return None
+        segment, u, point = best
+        t0, t1 = self.t_values[segment], self.t_values[segment + 1]
+        return float(best_sq) ** 0.5, float(t0 + u * (t1 - t0)), (float(point[0]), float(point[1])), segment
+
+    def query_box(self, x0, y0, x1, y1):
+        # Sorted indices of the segments that cross the rectangle: the tree
+        # prunes by box overlap, then each candidate is clipped exactly.
+        if self._count == 0:
+            return np.empty(0, dtype=np.intp)
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        boxes = self._boxes
+        found = []
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            box = boxes[node]
+            if box[0] > x1 or box[2] < x0 or box[1] > y1 or box[3] < y0:
+                continue
+            if node >= self._size:
+                found.append(node - self._size)
+            else:
+                stack.extend((2 * node + 1, 2 * node))
+        segments = np.array(sorted(found), dtype=np.intp)
+        return segments[self._crosses(segments, (x0, y0), (x1, y1))]
+
+    def _crosses(self, segments, low, high):
+        # Liang-Barsky clipping of every candidate segment at once.
+        start = self.points[segments]
+        delta = self.points[segments + 1] - start
+        enter = np.zeros(len(segments))
+        leave = np.ones(len(segments))
+        inside = np.ones(len(segments), dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis in range(2):
+                d = delta[:, axis]
+                a = (low[axis] - start[:, axis]) / d
+                b = (high[axis] - start[:, axis]) / d
+                flat = d == 0
+                inside &= ~flat | ((start[:, axis] >= low[axis]) & (start[:, axis] <= high[axis]))
+                enter = np.where(flat, enter, np.maximum(enter, np.minimum(a, b)))
+                leave = np.where(flat, leave, np.minimum(leave, np.maximum(a, b)))
+        return inside & (enter <= leave)
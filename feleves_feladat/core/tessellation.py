@@ -0,0 +1,97 @@
+import numpy as np
+
+from .bezier import split_bezier
+
+DEFAULT_TOLERANCE = 0.5
+
+
+def point_segment_distance(points, start, end):
+    segment = end - start
+    length_sq = np.einsum('ij,ij->i', segment, segment)
+    offset = points - start
+    u = np.divide(np.einsum('ij,ij->i', offset, segment), length_sq,
+                  out=np.zeros(len(points)), where=length_sq > 0)
+    nearest = start + np.clip(u, 0.0, 1.0)[:, None] * segment
+    return np.linalg.norm(points - nearest, axis=1)
+
+
+def flatten(evaluate, breakpoints, tolerance=DEFAULT_TOLERANCE, max_depth=10):
+    # Splits every interval of `breakpoints` at its quarter points until the
+    # curve at those parameters lies within `tolerance` of the chord; testing
+    # three interior points also catches inflections that a midpoint test
+    # misses. `evaluate` maps an array of parameters to an (m, dim) array of
+    # points and is called once per subdivision level. Returns the parameters
+    # and the polyline.
+    t_values = np.asarray(breakpoints, dtype=float)
+    points = np.asarray(evaluate(t_values), dtype=float)
+    pending = np.arange(len(t_values) - 1)
+    fractions = np.array([0.25, 0.5, 0.75])
+    for _ in range(max_depth):
+        if len(pending) == 0:
+            break
+        start_t, end_t = t_values[pending], t_values[pending + 1]
+        inner_t = start_t[:, None] + fractions * (end_t - start_t)[:, None]
+        inner = np.asarray(evaluate(inner_t.ravel()), dtype=float)
+        start = np.repeat(points[pending], 3, axis=0)
+        end = np.repeat(points[pending + 1], 3, axis=0)
+        deviation = point_segment_distance(inner, start, end).reshape(-1, 3).max(axis=1)
+        split = deviation > tolerance
+        if not split.any():
+            break
+        at = np.repeat(pending[split] + 1, 3)
+        t_values = np.insert(t_values, at, inner_t[split].ravel())
+        points = np.insert(points, at, inner.reshape(len(pending), 3, -1)[split].reshape(-1, points.shape[1]), axis=0)
+        first = pending[split] + 3 * np.arange(np.count_nonzero(split))
+        pending = (first[:, None] + np.arange(4)).ravel()
+    return t_values, points
+
+
+def uniform_breakpoints(t_start, t_end, segments):
+    return np.linspace(t_start, t_end, max(segments, 1) + 1)
+
+
+def bezier_flatness(segments):
+    # Largest distance of the inner control points from the chord. By the
+    # convex hull property the segment deviates from its chord by no more.
+    segments = np.asarray(segments, dtype=float)
+    count, m, dim = segments.shape
+    if m <= 2:
+        return np.zeros(count)
+    inner = segments[:, 1:-1].reshape(-1, dim)
+    start = np.repeat(segments[:, 0], m - 2, axis=0)
+    end = np.repeat(segments[:, -1], m - 2, axis=0)
+    return point_segment_distance(inner, start, end).reshape(count, m - 2).max(axis=1)
+
+
+def flatten_bezier(segments, tolerance=DEFAULT_TOLERANCE, breakpoints=None, max_depth=16):
+    # Polyline of a chain of Bezier segments given as a (S, m, dim) array,
+    # segment i spanning breakpoints[i] .. breakpoints[i + 1] (default 0 .. S).
+    # A segment whose control polygon is within `tolerance` of its chord
+    # contributes its start point; the others are halved with De Casteljau,
+    # all of one level at once. No basis function is evaluated. Returns the
+    # parameters and the polyline, like flatten().
+    segments = np.asarray(segments, dtype=float)
+    if len(segments) == 0:
+        return np.empty(0), np.empty((0, segments.shape[-1]))
+    if breakpoints is None:
+        breakpoints = np.arange(len(segments) + 1, dtype=float)
+    breakpoints = np.asarray(breakpoints, dtype=float)
+    pending, start_t, end_t = segments, breakpoints[:-1], breakpoints[1:]
+    t_parts, point_parts = [], []
+    for depth in range(max_depth + 1):
+        flat = bezier_flatness(pending) <= tolerance
+        if depth == max_depth:
+            flat[:] = True
+        t_parts.append(start_t[flat])
+        point_parts.append(pending[flat, 0])
+        if flat.all():
+            break
+        split = ~flat
+        left, right = split_bezier(pending[split])
+        mid_t = 0.5 * (start_t[split] + end_t[split])
+        pending = np.concatenate([left, right])
+        start_t, end_t = np.concatenate([start_t[split], mid_t]), np.concatenate([mid_t, end_t[split]])
+    t_values = np.concatenate(t_parts + [breakpoints[-1:]])
+    points = np.concatenate(point_parts + [segments[-1, -1:]])
+    order = np.argsort(t_values, kind='stable')
+    return t_values[order], points[order]
@@ -1,4 +1,16 @@
+import argparse
+
+from core import backends
 from ui.app import run
 
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", help="write per-frame timings to this .json or .csv file on exit")
+    parser.add_argument("--profile", action="store_true", help="start with the frame-time overlay visible")
+    parser.add_argument("--backend", default="auto", help="compute backend: auto, numpy or numba")
+    args = parser.parse_args()
+    try:
+        backends.set_backend(args.backend)
+    except (ImportError, ValueError) as error:
+        parser.error(f"backend {args.backend!r} is not usable: {error}")
+    run(trace_path=args.trace, show_profile=args.profile)
@@ -1,48 +1,69 @@
 import pygame
 import sys
-from core.bspline import BSplineInterpolation
+from core.profiling import FrameProfiler
+from ui.bspline import BSplineInterpolation
+from ui import renderer
 
-def run():
+def run(trace_path=None, show_profile=False):
     pygame.init()
     screen = pygame.display.set_mode((1000, 600))
     pygame.display.set_caption("B-Spline Visualization and Approximation")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont("Arial", 18)
+    profile_font = pygame.font.SysFont("Courier New", 14)
 
-    interpolator = BSplineInterpolation()
+    # The profiler only runs while the overlay is visible or a trace is
+    # being recorded.
+    profiler = FrameProfiler(enabled=show_profile or trace_path is not None, record=trace_path is not None)
+    interpolator = BSplineInterpolation(profiler)
 
     running = True
     while running:
-        for event in pygame.event.get():
-            interpolator.handle_sliders(event)
+        profiler.begin_frame()
+        with profiler.stage('events'):
+            for event in pygame.event.get():
+                interpolator.handle_sliders(event)
 
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    interpolator.selected_point = interpolator.find_point(*event.pos)
-                elif event.button == 3:
-                    interpolator.add_point(*event.pos)
-            elif event.type == pygame.MOUSEBUTTONUP:
-                interpolator.selected_point = None
-            elif event.type == pygame.MOUSEMOTION and interpolator.selected_point:
-                interpolator.selected_point['x'], interpolator.selected_point['y'] = event.pos
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_g:
-                    interpolator.show_global_approx = not interpolator.show_global_approx
-                    if interpolator.show_global_approx:
-                        interpolator.show_lower_order = False
-                elif event.key == pygame.K_a:
-                    interpolator.show_lower_order = not interpolator.show_lower_order
-                    if interpolator.show_lower_order:
-                        interpolator.show_global_approx = False
-                elif event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE:
-                    if interpolator.selected_point:
-                        interpolator.remove_point(interpolator.selected_point)
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:
+                        interpolator.selected_point = interpolator.find_point(*event.pos)
+                    elif event.button == 3:
+                        interpolator.add_point(*event.pos)
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    interpolator.selected_point = None
+                elif event.type == pygame.MOUSEMOTION and interpolator.selected_point is not None:
+                    interpolator.move_point(interpolator.selected_point, *event.pos)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_g:
+                        interpolator.show_global_approx = not interpolator.show_global_approx
+                        if interpolator.show_global_approx:
+                            interpolator.show_lower_order = False
+                    elif event.key == pygame.K_a:
+                        interpolator.show_lower_order = not interpolator.show_lower_order
+                        if interpolator.show_lower_order:
+                            interpolator.show_global_approx = False
+                    elif event.key == pygame.K_p:
+                        show_profile = not show_profile
+                        profiler.enabled = show_profile or trace_path is not None
+                    elif event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE:
+                        if interpolator.selected_point is not None:
+                            interpolator.remove_point(interpolator.selected_point)
 
-        interpolator.draw(screen, font)
-        pygame.display.flip()
-        clock.tick(60)
+        with profiler.stage('draw'):
+            interpolator.draw(screen, font)
+        if show_profile:
+            with profiler.stage('overlay'):
+                renderer.draw_text_panel(screen, profile_font, profiler.summary_lines(), (700, 10))
+        with profiler.stage('flip'):
+            pygame.display.flip()
+        with profiler.stage('tick'):
+            clock.tick(60)
+        profiler.end_frame()
 
+    interpolator.close()
+    if trace_path is not None:
+        profiler.export(trace_path)
     pygame.quit()
     sys.exit()
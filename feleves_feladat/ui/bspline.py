@@ -0,0 +1,358 @@
+import pygame
+import numpy as np
+from time import perf_counter
+from core.bspline_calculator import BSplineCalculator
+from core.bspline_approximator import BSplineApproximator
+from core.control_points import ControlPointStore
+from core.spatial_index import SegmentBVH
+from core.incremental import IncrementalBSpline
+from core.intersection import intersect
+from core import approximation_error
+from core.background import LatestJobWorker
+from core.profiling import FrameProfiler
+from ui import renderer
+
+HEAT_MAP_LEVELS = 16
+STALE_TEXT_COLOR = (130, 130, 130)
+CURVE_PICK_RADIUS = 8
+CROSSING_COLOR = (150, 0, 150)
+
+
+def _approximate(approximator, points, k, approximation_k, need_lsq, need_lower_order):
+    # Returns (results, timings). The stages are timed here, where they run,
+    # since that may be the worker thread; timings maps profiler stage names
+    # to seconds.
+    results, timings = {}, {}
+    if need_lsq:
+        start = perf_counter()
+        new_ctrl, max_error, rms_error = approximator.least_squares_approximation(
+            points, k, approximation_k, num_target_ctrl_points=len(points))
+        curve = approximator.calculator.compute_bspline(new_ctrl, approximation_k) if len(new_ctrl) else np.empty((0, 2))
+        results['lsq'] = (new_ctrl, max_error, rms_error, curve)
+        timings['draw.lsq'] = perf_counter() - start
+        if len(new_ctrl):
+            start = perf_counter()
+            results['lsq_crossings'] = intersect(points, k, new_ctrl, approximation_k,
+                                                 calculator=approximator.calculator)[1]
+            timings['draw.intersection'] = perf_counter() - start
+    if need_lower_order:
+        start = perf_counter()
+        results['lower_order'] = approximator.compute_approximation_by_order(points, k, approximation_k)
+        timings['draw.lower_order'] = perf_counter() - start
+        start = perf_counter()
+        results['lower_order_crossings'] = intersect(points, k, points, approximation_k,
+                                                     calculator=approximator.calculator)[1]
+        timings['draw.intersection'] = timings.get('draw.intersection', 0.0) + perf_counter() - start
+    return results, timings
+
+
+def _approximate_job(version, *args):
+    return (version,) + _approximate(*args)
+
+
+class _VersionedAttribute:
+    # Assigning a different value bumps the owner's version, which
+    # invalidates the cached frame.
+    def __set_name__(self, owner, name):
+        self.name = '_' + name
+
+    def __get__(self, obj, objtype=None):
+        return self if obj is None else getattr(obj, self.name)
+
+    def __set__(self, obj, value):
+        if getattr(obj, self.name, None) != value:
+            setattr(obj, self.name, value)
+            obj.version += 1
+
+
+class BSplineInterpolation:
+    k = _VersionedAttribute()
+    approximation_k = _VersionedAttribute()
+    show_global_approx = _VersionedAttribute()
+    show_lower_order = _VersionedAttribute()
+
+    def __init__(self, profiler=None, background=True):
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.version = 0
+        self._frame = None
+        self._frame_key = None
+        # The worker thread gets its own approximator: the basis caches are
+        # not shared between threads.
+        self.worker = LatestJobWorker('approximation-worker') if background else None
+        self._worker_approximator = BSplineApproximator(BSplineCalculator()) if background else None
+        self._submitted_version = None
+        self._approximation = None
+        self._results_seq = 0
+        self._points = ControlPointStore([(100 + i * 100, 300 if i % 2 == 0 else 100) for i in range(8)])
+        self.k = 4
+        self.approximation_k = 3
+        self.min_k = 2
+        self.max_k = 10
+        self.k = max(self.min_k, min(self.max_k, self.k, len(self._points)))
+        self.approximation_k = max(self.min_k, min(self.max_k, self.approximation_k, len(self._points), self.k))
+        self.show_global_approx = False
+        self.show_lower_order = False
+        self.selected_point = None
+        self.calculator = BSplineCalculator()
+        self.approximator = BSplineApproximator(self.calculator)
+        self.curve = IncrementalBSpline(self.calculator)
+        self._curve_bvh = SegmentBVH()
+        self._curve_bvh_version = None
+        self.slider_k_rect = pygame.Rect(20, 540, 200, 10)
+        self.slider_k_handle = pygame.Rect(0, 0, 10, 20)
+        self.slider_approx_rect = pygame.Rect(20, 570, 200, 10)
+        self.slider_approx_handle = pygame.Rect(0, 0, 10, 20)
+        self.dragging_k = False
+        self.dragging_approx = False
+        self.update_slider_positions()
+
+    def update_slider_positions(self):
+        slider_width = self.slider_k_rect.width
+        handle_width = self.slider_k_handle.width
+        usable_width = slider_width - handle_width
+        k_range = self.max_k - self.min_k
+        clamped_k = max(self.min_k, min(self.max_k, self.k))
+        ratio_k = (clamped_k - self.min_k) / k_range if k_range > 0 else 0
+        self.slider_k_handle.left = self.slider_k_rect.left + int(ratio_k * usable_width)
+        self.slider_k_handle.centery = self.slider_k_rect.centery
+        clamped_approx_k = max(self.min_k, min(self.max_k, self.approximation_k))
+        ratio_approx = (clamped_approx_k - self.min_k) / k_range if k_range > 0 else 0
+        self.slider_approx_handle.left = self.slider_approx_rect.left + int(ratio_approx * usable_width)
+        self.slider_approx_handle.centery = self.slider_approx_rect.centery
+
+    def find_point(self, x, y):
+        return self._points.find(x, y)
+
+    def move_point(self, point, x, y):
+        self._points.set(point, x, y)
+        self.version += 1
+
+    def curve_bvh(self):
+        # Boxes over the evaluated curve, refitted once per edit; moving a
+        # point only changes the samples in its support, so only those
+        # leaves are refitted.
+        if self._curve_bvh_version != self.version:
+            points = self._points.array
+            curve_points = self.curve.evaluate(points, self.k) if len(points) >= self.k else np.empty((0, 2))
+            self._curve_bvh.update(curve_points, self.curve.t_values if len(curve_points) else None)
+            self._curve_bvh_version = self.version
+        return self._curve_bvh
+
+    def curve_location(self, x, y, radius=CURVE_PICK_RADIUS):
+        # (distance, t, point, segment) of the curve point nearest to (x, y),
+        # or None when the curve is farther than `radius`.
+        return self.curve_bvh().nearest(x, y, radius)
+
+    def add_point(self, x, y):
+        # A click on the curve inserts the point where the curve passes, in
+        # parameter order (by Greville abscissa); elsewhere the point is
+        # appended and the polygon re-sorted by x.
+        location = self.curve_location(x, y)
+        if location is not None:
+            n = len(self._points)
+            greville = self.calculator.greville_abscissae(n, self.k)
+            index = int(np.clip(np.searchsorted(greville, location[1]), 1, n - 1))
+            self._points.insert(index, x, y)
+        else:
+            self._points.append(x, y)
+            self._points.sort_by_x()
+        self.version += 1
+        self.k = max(self.min_k, min(self.k, len(self._points)))
+        self.approximation_k = max(self.min_k, min(self.approximation_k, len(self._points), self.k))
+        self.update_slider_positions()
+
+    def remove_point(self, point):
+        if point in self._points:
+            self._points.remove(point)
+            self.selected_point = None
+            self.version += 1
+            self.k = max(self.min_k, min(self.k, len(self._points)))
+            self.approximation_k = max(self.min_k, min(self.approximation_k, len(self._points), self.k))
+            self.update_slider_positions()
+
+    def handle_sliders(self, event):
+        slider_width = self.slider_k_rect.width
+        handle_width = self.slider_k_handle.width
+        usable_width = slider_width - handle_width
+        slider_value_range = self.max_k - self.min_k
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.slider_k_handle.collidepoint(event.pos):
+                self.dragging_k = True
+            elif self.slider_approx_handle.collidepoint(event.pos):
+                self.dragging_approx = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging_k = False
+            self.dragging_approx = False
+        elif event.type == pygame.MOUSEMOTION:
+            if self.dragging_k and slider_value_range > 0 and usable_width > 0:
+                mouse_x_in_track = max(0, min(event.pos[0] - self.slider_k_rect.left, usable_width))
+                ratio = mouse_x_in_track / usable_width
+                raw_k = int(round(ratio * slider_value_range + self.min_k))
+                self.k = max(self.min_k, min(self.max_k, raw_k, len(self._points)))
+                self.approximation_k = min(self.approximation_k, self.k)
+                self.update_slider_positions()
+            if self.dragging_approx and slider_value_range > 0 and usable_width > 0:
+                mouse_x_in_track = max(0, min(event.pos[0] - self.slider_approx_rect.left, usable_width))
+                ratio = mouse_x_in_track / usable_width
+                raw_approx_k = int(round(ratio * slider_value_range + self.min_k))
+                self.approximation_k = max(self.min_k, min(self.max_k, raw_approx_k, len(self._points), self.k))
+                self.update_slider_positions()
+
+    def _approximations(self, points, need_lsq, need_lower_order):
+        # Returns (results, stale). Without a worker the fits run here; with
+        # one, an edit submits a job (superseding any older one) and the last
+        # finished results are used, flagged stale until the new ones arrive.
+        # results is None when the job failed.
+        if not (need_lsq or need_lower_order):
+            return {}, False
+        if self.worker is None:
+            results, timings = _approximate(self.approximator, points, self.k, self.approximation_k,
+                                            need_lsq, need_lower_order)
+            self._add_timings(timings)
+            return results, False
+        if self._submitted_version != self.version:
+            self.worker.submit(_approximate_job, self.version, self._worker_approximator, points.copy(),
+                               self.k, self.approximation_k, need_lsq, need_lower_order)
+            self._submitted_version = self.version
+        if self._approximation is None:
+            return {}, True
+        version, results = self._approximation
+        return results, version != self.version
+
+    def poll_worker(self):
+        # Picks up a finished background job; the frame is rebuilt when one
+        # arrived. Returns True in that case.
+        if self.worker is None:
+            return False
+        finished = self.worker.take_result()
+        if finished is None:
+            return False
+        _, result, error = finished
+        if error is not None:
+            print(f"Background approximation failed: {error}")
+            self._approximation = (self._submitted_version, None)
+        else:
+            version, results, timings = result
+            self._approximation = (version, results)
+            self._add_timings(timings)
+        self._results_seq += 1
+        return True
+
+    def _add_timings(self, timings):
+        # Stage times of a finished fit go into the frame that picks it up.
+        for name, seconds in timings.items():
+            self.profiler.add(name, seconds)
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+
+    def _build_frame(self, font):
+        points = self._points.array
+        frame = {'curve': None, 'lsq_curve': None, 'lsq_ctrl': None, 'lo_curve': None, 'lo_colors': None,
+                 'crossings': None}
+        messages = []
+        if len(points) >= self.k and self.k >= self.min_k:
+            with self.profiler.stage('draw.curve'):
+                curve_points = self.curve.evaluate(points, self.k)
+            if len(curve_points) > 1:
+                frame['curve'] = renderer.to_pixels(curve_points)
+            elif len(curve_points) == 0 and len(points) >= self.min_k:
+                messages.append((f"Original spline computation failed (k={self.k}, points={len(points)}).", (255, 0, 0)))
+        elif len(points) < self.k and len(points) >= self.min_k:
+            messages.append((f"Need at least {self.k} points for original spline (current: {len(points)}).", (255, 0, 0)))
+        elif len(points) < self.min_k:
+            messages.append((f"Need at least {self.min_k} points for any spline (current: {len(points)}).", (255, 0, 0)))
+        can_approximate = len(points) >= self.approximation_k and self.approximation_k >= self.min_k
+        need_lsq = self.show_global_approx and can_approximate
+        need_lower_order = self.show_lower_order and can_approximate
+        results, stale = self._approximations(points, need_lsq, need_lower_order)
+        stale_suffix = " (stale, updating...)" if stale else ""
+        text_color = STALE_TEXT_COLOR if stale else (0, 0, 0)
+        frame['stale'] = stale
+        if self.show_global_approx:
+            if need_lsq and results is None:
+                messages.append(("[LSQ] Approximation failed (check console for errors).", (255, 0, 0)))
+            elif need_lsq and 'lsq' not in results:
+                messages.append(("[LSQ] Computing approximation...", STALE_TEXT_COLOR))
+            elif need_lsq:
+                new_ctrl, max_error_lsq, rms_error_lsq, approx_curve_lsq = results['lsq']
+                if len(new_ctrl):
+                    if len(approx_curve_lsq) > 1:
+                        frame['lsq_curve'] = renderer.to_pixels(approx_curve_lsq)
+                        frame['lsq_ctrl'] = renderer.to_pixels(new_ctrl)
+                        crossings = results.get('lsq_crossings', ())
+                        if len(crossings):
+                            frame['crossings'] = renderer.to_pixels(crossings)
+                        messages.append((f"[LSQ] Approx k={self.approximation_k}, Max error: {max_error_lsq:.2f}, RMS error: {rms_error_lsq:.2f}, Crossings: {len(crossings)}{stale_suffix}", text_color))
+                    elif len(approx_curve_lsq) == 0:
+                        messages.append((f"[LSQ] Cannot compute approx curve for drawing (k={self.approximation_k}, ctrl pts={len(new_ctrl)}).", (255, 0, 0)))
+                else:
+                    messages.append(("[LSQ] Approximation failed (check console for errors).", (255, 0, 0)))
+            elif len(points) < self.approximation_k and len(points) >= self.min_k:
+                messages.append((f"[LSQ] Need at least {self.approximation_k} points for approx order {self.approximation_k} (current: {len(points)}).", (255, 0, 0)))
+        if self.show_lower_order:
+            if need_lower_order and results is None:
+                messages.append(("[Orig Pts] Approximation failed (check console for errors).", (255, 0, 0)))
+            elif need_lower_order and 'lower_order' not in results:
+                messages.append(("[Orig Pts] Computing approximation...", STALE_TEXT_COLOR))
+            elif need_lower_order:
+                approx_points_lo, max_error_lo, rms_error_lo, errors_list_lo = results['lower_order']
+                if len(approx_points_lo) > 1:
+                    frame['lo_curve'] = renderer.to_pixels(approx_points_lo)
+                    frame['lo_colors'] = approximation_error.segment_colors(errors_list_lo, HEAT_MAP_LEVELS)
+                    if stale:
+                        frame['lo_colors'] = frame['lo_colors'] // 2 + 128
+                    crossings = results.get('lower_order_crossings', ())
+                    if len(crossings):
+                        frame['crossings'] = renderer.to_pixels(crossings)
+                    messages.append((f"[Orig Pts] Approx k={self.approximation_k}, Max error: {max_error_lo:.2f}, RMS error: {rms_error_lo:.2f}, Crossings: {len(crossings)}{stale_suffix}", text_color))
+                elif len(approx_points_lo) == 0:
+                    messages.append((f"[Orig Pts] Cannot compute approx curve (k={self.approximation_k}, points={len(points)}).", (255, 0, 0)))
+            elif len(points) < self.approximation_k and len(points) >= self.min_k:
+                messages.append((f"[Orig Pts] Need at least {self.approximation_k} points for approx order {self.approximation_k} (current: {len(points)}).", (255, 0, 0)))
+        instructions = "Left Click: Select/Drag Pt | Right Click: Add Pt | Del/Backspace: Remove Selected Pt | G: Toggle LSQ Approx | A: Toggle Orig Pts Approx | P: Toggle Profiler"
+        messages.append((instructions, (0, 0, 0)))
+        with self.profiler.stage('draw.fonts'):
+            frame['texts'] = [font.render(text, True, color) for text, color in messages]
+            frame['k_label'] = font.render(f"Original k = {self.k}", True, (0, 0, 0))
+            frame['approx_k_label'] = font.render(f"Approx k = {self.approximation_k}", True, (0, 0, 0))
+        return frame
+
+    def draw(self, screen, font):
+        self.poll_worker()
+        frame_key = (self.version, self._results_seq, id(font))
+        if self._frame_key != frame_key:
+            self._frame = self._build_frame(font)
+            self._frame_key = frame_key
+        frame = self._frame
+
+        with self.profiler.stage('draw.lines'):
+            screen.fill((255, 255, 255))
+            renderer.draw_points(screen, (0, 0, 255), self._points.array, 5,
+                                 highlight=self._points.index_of(self.selected_point), highlight_color=(255, 165, 0))
+            if frame['curve'] is not None:
+                renderer.draw_polyline(screen, (255, 0, 0), frame['curve'], 2)
+            if frame['lsq_curve'] is not None:
+                renderer.draw_polyline(screen, (170, 225, 170) if frame['stale'] else (0, 200, 0), frame['lsq_curve'], 2)
+                renderer.draw_points(screen, (150, 190, 150) if frame['stale'] else (0, 100, 0), frame['lsq_ctrl'], 5)
+            if frame['lo_curve'] is not None:
+                renderer.draw_colored_strip(screen, frame['lo_curve'], frame['lo_colors'], 4)
+            if frame['crossings'] is not None:
+                renderer.draw_points(screen, CROSSING_COLOR, frame['crossings'], 4)
+        with self.profiler.stage('draw.blit'):
+            self._draw_texts_and_sliders(screen, font, frame)
+
+    def _draw_texts_and_sliders(self, screen, font, frame):
+        text_y = 10
+        line_height = font.get_linesize() + 5
+        for surface in frame['texts']:
+            screen.blit(surface, (10, text_y))
+            text_y += line_height
+        pygame.draw.rect(screen, (180, 180, 180), self.slider_k_rect)
+        pygame.draw.rect(screen, (50, 50, 200), self.slider_k_handle)
+        screen.blit(frame['k_label'], (self.slider_k_rect.left, self.slider_k_rect.top - 20))
+        pygame.draw.rect(screen, (180, 180, 180), self.slider_approx_rect)
+        pygame.draw.rect(screen, (200, 100, 50), self.slider_approx_handle)
+        screen.blit(frame['approx_k_label'], (self.slider_approx_rect.left, self.slider_approx_rect.top - 20))
@@ -0,0 +1,61 @@
+import numpy as np
+import pygame
+
+
+def to_pixels(points):
+    return np.asarray(points).astype(int)
+
+
+# pygame walks plain lists several times faster than ndarrays, so every
+# drawing call converts its coordinates once with tolist().
+
+def draw_polyline(surface, color, points, width=1):
+    if len(points) > 1:
+        pygame.draw.lines(surface, color, False, to_pixels(points).tolist(), width)
+
+
+def draw_polylines(surface, color, polylines, width=1):
+    for points in polylines:
+        draw_polyline(surface, color, points, width)
+
+
+def draw_points(surface, color, points, radius=5, highlight=None, highlight_color=None):
+    # pygame has no batched circle call; this is the only per-point loop left.
+    for i, point in enumerate(to_pixels(points).tolist()):
+        pygame.draw.circle(surface, highlight_color if i == highlight else color, point, radius)
+
+
+def color_runs(colors):
+    # Start/end segment indices of the runs of consecutive equal colors.
+    colors = np.asarray(colors)
+    if len(colors) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    change = np.flatnonzero(np.any(colors[1:] != colors[:-1], axis=1)) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [len(colors)]])
+    return starts, ends
+
+
+def draw_colored_strip(surface, points, colors, width=1):
+    # `colors` holds one RGB row per segment. Each run of equal colors becomes
+    # a single pygame.draw.lines call, so a quantized heat map along a smooth
+    # error field needs only a handful of calls.
+    pixels = to_pixels(points).tolist()
+    colors = np.asarray(colors)
+    starts, ends = color_runs(colors)
+    run_colors = colors[starts].tolist()
+    for color, start, end in zip(run_colors, starts.tolist(), ends.tolist()):
+        pygame.draw.lines(surface, color, False, pixels[start:end + 1], width)
+
+
+def draw_text_panel(surface, font, lines, topleft, color=(0, 0, 0), background=(235, 235, 235)):
+    rendered = [font.render(line, True, color) for line in lines]
+    if not rendered:
+        return
+    line_height = font.get_linesize()
+    width = max(text.get_width() for text in rendered)
+    x, y = topleft
+    pygame.draw.rect(surface, background, (x - 4, y - 4, width + 8, line_height * len(rendered) + 8))
+    for text in rendered:
+        surface.blit(text, (x, y))
+        y += line_height
@@ -1,45 +1,56 @@
 import pygame
 import sys
+from feleves_feladat.core.barycentric import (BarycentricInterpolator, chebyshev_nodes, chebyshev_weights,
+                                              equispaced_nodes, equispaced_weights)
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.ui import renderer
+from feleves_feladat.core.tessellation import flatten, uniform_breakpoints
 
 
 class LagrangeInterpolation:
     def __init__(self):
-        self._points = [
-            {'x': 100, 'y': 300},
-            {'x': 300, 'y': 100},
-            {'x': 500, 'y': 300},
-            {'x': 700, 'y': 100},
-        ]
+        self._points = ControlPointStore([
+            (100, 300),
+            (300, 100),
+            (500, 300),
+            (700, 100),
+        ])
         self.selected_point = None
+        self.use_chebyshev_nodes = False
+        self._interpolator = None
+        self._node_key = None
+
+    def interpolator(self):
+        # The barycentric weights only depend on the node set, so they are
+        # rebuilt when the point count or the node mode changes, not on drags.
+        points = self._points.array
+        key = (len(points), self.use_chebyshev_nodes)
+        if self._node_key != key:
+            n = len(points)
+            if self.use_chebyshev_nodes:
+                nodes, weights = chebyshev_nodes(n), chebyshev_weights(n)
+            else:
+                nodes, weights = equispaced_nodes(n), equispaced_weights(n)
+            self._interpolator = BarycentricInterpolator(nodes, points, weights)
+            self._node_key = key
+        self._interpolator.values = points
+        return self._interpolator
 
     def lagrange_interpolation(self, t):
-        x, y = 0, 0
-        n = len(self._points)
-        for i in range(n):
-            term = 1
-            for j in range(n):
-                if i != j:
-                    term *= (t - j / (n - 1)) / ((i / (n - 1)) - (j / (n - 1)))
-            x += term * self._points[i]['x']
-            y += term * self._points[i]['y']
-        return {'x': x, 'y': y}
+        return self.interpolator()(t)
+
+    def tessellate(self):
+        return flatten(self.lagrange_interpolation, uniform_breakpoints(0, 1, max(len(self._points) - 1, 4)))
 
     def find_point(self, x, y):
-        for point in self._points:
-            if ((point['x'] - x) ** 2 + (point['y'] - y) ** 2) ** 0.5 < 10:
-                return point
-        return None
+        return self._points.find(x, y)
 
     def draw(self, screen):
         screen.fill((255, 255, 255))
-        for point in self._points:
-            pygame.draw.circle(screen, (0, 0, 255), (int(point['x']), int(point['y'])), 5)
+        renderer.draw_points(screen, (0, 0, 255), self._points.array, 5)
 
-        curve_points = [self.lagrange_interpolation(t / 100) for t in range(101)]
-        for i in range(len(curve_points) - 1):
-            pygame.draw.line(screen, (255, 0, 0),
-                             (int(curve_points[i]['x']), int(curve_points[i]['y'])),
-                             (int(curve_points[i + 1]['x']), int(curve_points[i + 1]['y'])), 2)
+        _, curve_points = self.tessellate()
+        renderer.draw_polyline(screen, (255, 0, 0), curve_points, 2)
 
     def run(self):
         pygame.init()
@@ -55,8 +66,10 @@ class LagrangeInterpolation:
                     self.selected_point = self.find_point(*event.pos)
                 elif event.type == pygame.MOUSEBUTTONUP:
                     self.selected_point = None
-                elif event.type == pygame.MOUSEMOTION and self.selected_point:
-                    self.selected_point['x'], self.selected_point['y'] = event.pos
+                elif event.type == pygame.MOUSEMOTION and self.selected_point is not None:
+                    self._points.set(self.selected_point, *event.pos)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                    self.use_chebyshev_nodes = not self.use_chebyshev_nodes
 
             self.draw(screen)
             pygame.display.flip()
@@ -1,61 +1,82 @@
-from math import comb
-
-
+import itertools
 import pygame
 import sys
+import numpy as np
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.core.spatial_index import SegmentBVH
+from feleves_feladat.ui import renderer
+from feleves_feladat.core.basis_cache import BasisCache
+from feleves_feladat.core.bezier import bernstein_matrix, rational_bezier_points
+from feleves_feladat.core.tessellation import flatten, uniform_breakpoints
 
+# flatten() evaluates the breakpoints, then their quarter points (every
+# interval is split once); both are the same for every drag.
+FIXED_LEVELS = 2
 
 
-def bernstein(n, k, x):
-    return comb(n, k) * (x ** k) * ((1 - x) ** (n - k))
-
 class BezierCurve:
     def __init__(self):
-        self._points = [
-            {'x': 100, 'y': 300},
-            {'x': 300, 'y': 100},
-            {'x': 500, 'y': 300},
-            {'x': 700, 'y': 100},
-        ]
+        self._points = ControlPointStore([
+            (100, 300),
+            (300, 100),
+            (500, 300),
+            (700, 100),
+        ])
         self.weights = [1, 2, 2, 1]
         self.selected_point = None
-
-    def denominator(self,t):
-        n = len(self._points)
-        sum = 0
-        for j in range(n):
-            sum +=  self.weights[j] * bernstein(n, j, t)
-
-        return sum
-
-    def bezier(self,t):
-        n = len(self._points)
-        x = 0
-        y = 0
-
-        for i in range(n):
-            x += ((self.weights[i] * bernstein(n, i, t)) / ( self.denominator(t) )) * self._points[i]["x"]
-            y += ((self.weights[i] * bernstein(n, i, t))  / ( self.denominator(t) ) )* self._points[i]["y"]
-
-
-        return {'x': x, 'y': y}
+        self.basis_cache = BasisCache()
+        self._bvh = SegmentBVH()
+
+    def bernstein_basis(self, t_values, cache=True):
+        degree = len(self._points) - 1
+        if not cache:
+            return bernstein_matrix(degree, t_values)
+        key = BasisCache.make_key('bernstein', len(self._points), degree, t_values, ())
+        return self.basis_cache.get_or_compute(key, lambda: bernstein_matrix(degree, t_values))
+
+    def denominator(self, t, cache=False):
+        t = np.asarray(t, dtype=float)
+        return (self.bernstein_basis(t.reshape(-1), cache) @ np.asarray(self.weights, dtype=float)).reshape(t.shape)
+
+    def bezier(self, t, cache=False):
+        t = np.asarray(t, dtype=float)
+        basis = self.bernstein_basis(t.reshape(-1), cache)
+        curve = rational_bezier_points(self._points.array, self.weights, basis)
+        return curve.reshape(t.shape + (2,))
+
+    def tessellate(self):
+        # Only the fixed levels go through the basis cache. The adaptive
+        # refinement parameters change with every drag; cached, they would
+        # push the fixed matrices out.
+        levels = itertools.count()
+        return flatten(lambda t: self.bezier(t, cache=next(levels) < FIXED_LEVELS),
+                       uniform_breakpoints(0, 1, max(len(self._points) - 1, 4)))
 
     def find_point(self, x, y):
-        for point in self._points:
-            if ((point['x'] - x) ** 2 + (point['y'] - y) ** 2) ** 0.5 < 10:
-                return point
-        return None
+        return self._points.find(x, y)
+
+    def curve_bvh(self):
+        t_values, curve_points = self.tessellate()
+        self._bvh.update(curve_points, t_values)
+        return self._bvh
+
+    def add_point(self, x, y, radius=8):
+        # A click on the curve inserts a control point (weight 1) where the
+        # curve passes: control point i belongs to t = i / degree.
+        location = self.curve_bvh().nearest(x, y, radius)
+        if location is None:
+            return None
+        n = len(self._points)
+        index = int(np.clip(np.searchsorted(np.linspace(0, 1, n), location[1]), 1, n - 1))
+        self.weights.insert(index, 1)
+        return self._points.insert(index, x, y)
 
     def draw(self, screen):
         screen.fill((255, 255, 255))
-        for point in self._points:
-            pygame.draw.circle(screen, (0, 0, 255), (int(point['x']), int(point['y'])), 5)
+        renderer.draw_points(screen, (0, 0, 255), self._points.array, 5)
 
-        curve_points = [self.bezier(t / 100) for t in range(0,101) if t != 100]
-        for i in range(len(curve_points) - 1):
-            pygame.draw.line(screen, (255, 0, 0),
-                             (int(curve_points[i]['x']), int(curve_points[i]['y'])),
-                             (int(curve_points[i + 1]['x']), int(curve_points[i + 1]['y'])), 2)
+        _, curve_points = self.tessellate()
+        renderer.draw_polyline(screen, (255, 0, 0), curve_points, 2)
 
     def run(self):
         pygame.init()
@@ -68,11 +89,14 @@ class BezierCurve:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.selected_point = self.find_point(*event.pos)
+                    if event.button == 3:
+                        self.add_point(*event.pos)
+                    else:
+                        self.selected_point = self.find_point(*event.pos)
                 elif event.type == pygame.MOUSEBUTTONUP:
                     self.selected_point = None
-                elif event.type == pygame.MOUSEMOTION and self.selected_point:
-                    self.selected_point['x'], self.selected_point['y'] = event.pos
+                elif event.type == pygame.MOUSEMOTION and self.selected_point is not None:
+                    self._points.set(self.selected_point, *event.pos)
 
             self.draw(screen)
             pygame.display.flip()
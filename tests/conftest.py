@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The tests import the core as feleves_feladat.core, like the benchmarks
+# and the root-level scripts, whichever directory pytest is started from.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
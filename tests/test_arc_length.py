@@ -0,0 +1,42 @@
+import numpy as np
+
+from feleves_feladat.core.bspline_approximator import BSplineApproximator
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+
+
+def test_arc_length_table_is_reused_until_an_edit():
+    calculator = BSplineCalculator()
+    ctrl = np.array([[0, 0], [100, 200], [300, 100], [400, 400], [600, 0]], dtype=float)
+    table = calculator.arc_length_table(ctrl, 4)
+    assert calculator.arc_length_table(ctrl.copy(), 4) is table
+    moved = ctrl.copy()
+    moved[2] += 10
+    assert calculator.arc_length_table(moved, 4) is not table
+
+
+def test_drags_do_not_fill_the_basis_cache():
+    calculator = BSplineCalculator()
+    ctrl = np.array([[0, 0], [100, 200], [300, 100], [400, 400], [600, 0]], dtype=float)
+    calculator.sample_parameters(ctrl, 4, 200, spacing='arc_length')
+    entries = calculator.cache.stats()['entries']
+    for step in range(20):
+        ctrl[2] += 1
+        calculator.sample_parameters(ctrl, 4, 200, spacing='arc_length')
+    assert calculator.cache.stats()['entries'] == entries
+
+
+def test_arc_length_approximations_do_not_fill_the_basis_cache():
+    calculator = BSplineCalculator()
+    approximator = BSplineApproximator(calculator)
+    ctrl = np.array([[0, 0], [100, 200], [300, 100], [400, 400], [600, 0], [700, 300]], dtype=float)
+
+    def edit():
+        approximator.compute_approximation_by_order(ctrl, 4, 3, spacing='arc_length')
+        approximator.least_squares_approximation(ctrl, 4, 3, 5, spacing='arc_length')
+
+    edit()
+    entries = calculator.cache.stats()['entries']
+    for step in range(10):
+        ctrl[2] += 1
+        edit()
+    assert calculator.cache.stats()['entries'] == entries
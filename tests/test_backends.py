@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from feleves_feladat.core import backends, kernels_numpy
+from feleves_feladat.core.barycentric import chebyshev_nodes, node_weights
+from feleves_feladat.core.basis_cache import BasisCache
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+
+TOLERANCE = 1e-12
+
+
+@pytest.fixture(scope='module')
+def numba_kernels():
+    pytest.importorskip('numba')
+    return backends.load_backend('numba')
+
+
+def knot_vectors():
+    rng = np.random.default_rng(0)
+    for k in (1, 2, 3, 4, 6):
+        for n in (k, k + 3, 20):
+            yield k, np.linspace(0, 1, n + k)
+            knots = np.sort(np.concatenate([[0.0, 1.0], rng.random(n + k - 2)]))
+            if len(knots) > 4:
+                knots[2:4] = knots[2]
+            yield k, knots
+
+
+def parameters(knots):
+    # Random values inside and outside the knot range plus every knot, where
+    # the half-open span rule is decided.
+    rng = np.random.default_rng(1)
+    return np.concatenate([rng.uniform(knots[0] - 0.1, knots[-1] + 0.1, 200), knots, [np.nan]])
+
+
+def test_every_backend_provides_the_kernel_set():
+    for name in backends.available_backends():
+        module = backends.load_backend(name)
+        assert all(callable(getattr(module, kernel)) for kernel in backends.KERNELS)
+
+
+def test_find_spans(numba_kernels):
+    for _, knots in knot_vectors():
+        t_values = parameters(knots)
+        np.testing.assert_array_equal(numba_kernels.find_spans(t_values, knots),
+                                      kernels_numpy.find_spans(t_values, knots))
+
+
+def test_nonzero_basis(numba_kernels):
+    for k, knots in knot_vectors():
+        t_values = parameters(knots)
+        spans, values = numba_kernels.nonzero_basis(k, t_values, knots)
+        expected_spans, expected_values = kernels_numpy.nonzero_basis(k, t_values, knots)
+        np.testing.assert_array_equal(spans, expected_spans)
+        np.testing.assert_allclose(values, expected_values, rtol=0, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('n', [1, 2, 5, 12])
+def test_de_casteljau_points(numba_kernels, n):
+    rng = np.random.default_rng(n)
+    ctrl = rng.random((n, 2)) * 100
+    t_values = np.concatenate([rng.random(100), [0.0, 1.0]])
+    np.testing.assert_allclose(numba_kernels.de_casteljau_points(ctrl, t_values),
+                               kernels_numpy.de_casteljau_points(ctrl, t_values), rtol=0, atol=100 * TOLERANCE)
+
+
+@pytest.mark.parametrize('degree', [0, 1, 3, 11])
+def test_bernstein_matrix(numba_kernels, degree):
+    t_values = np.linspace(0, 1, 101)
+    np.testing.assert_allclose(numba_kernels.bernstein_matrix(degree, t_values),
+                               kernels_numpy.bernstein_matrix(degree, t_values), rtol=0, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('shape', [(20,), (20, 2), (20, 2, 3)])
+def test_barycentric_evaluate(numba_kernels, shape):
+    rng = np.random.default_rng(2)
+    nodes = chebyshev_nodes(shape[0])
+    weights = node_weights(nodes)
+    values = rng.random(shape)
+    # Exact nodes take the node's value instead of the formula.
+    t_values = np.concatenate([rng.random(100), nodes[:3]])
+    np.testing.assert_allclose(numba_kernels.barycentric_evaluate(nodes, weights, values, t_values),
+                               kernels_numpy.barycentric_evaluate(nodes, weights, values, t_values),
+                               rtol=0, atol=1e3 * TOLERANCE)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        backends.set_backend('no-such-backend')
+
+
+def test_use_backend_restores_the_previous_backend():
+    previous = backends.backend_name()
+    with backends.use_backend('numpy') as module:
+        assert module is kernels_numpy
+        assert backends.backend_name() == 'numpy'
+    assert backends.backend_name() == previous
+
+
+def test_cache_keys_depend_on_the_backend(numba_kernels):
+    calculator = BSplineCalculator()
+    t_values = np.linspace(0, 1, 50)
+    knots = np.linspace(0, 1, 12)
+    with backends.use_backend('numpy'):
+        numpy_key = BasisCache.make_key('nonzero', 8, 4, t_values, knots)
+        calculator.cached_nonzero_basis(8, 4, t_values, knots)
+    with backends.use_backend('numba'):
+        assert BasisCache.make_key('nonzero', 8, 4, t_values, knots) != numpy_key
+        calculator.cached_nonzero_basis(8, 4, t_values, knots)
+    assert calculator.cache.stats()['misses'] == 2
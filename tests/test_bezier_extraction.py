@@ -0,0 +1,59 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+from feleves_feladat.core.intersection import intersect
+from feleves_feladat.core.projection import CurveProjector
+
+scipy_interpolate = pytest.importorskip('scipy.interpolate')
+
+CLAMPED = [0, 0, 0, 0, .3, .3, .6, .8, 1, 1, 1, 1]
+
+
+def random_knots(rng, n, k):
+    # Clamped, with interior knots repeated up to k - 1 times.
+    values = np.sort(rng.choice(np.arange(1, 20) / 20, n - k, replace=False))
+    interior = np.repeat(values, rng.integers(1, k, n - k))[:n - k]
+    return np.concatenate([np.zeros(k), interior, np.ones(k)])
+
+
+def assert_matches_scipy(ctrl, k, knots):
+    segments = BSplineCalculator().to_bezier(ctrl, k, knots)
+    spline = scipy_interpolate.BSpline(knots, ctrl, k - 1)
+    u = np.linspace(0.01, 0.99, 9)
+    bernstein = np.array([[comb(k - 1, i) * x ** i * (1 - x) ** (k - 1 - i) for i in range(k)] for x in u])
+    for segment, start, end in zip(segments, knots[k - 1:], knots[k:len(ctrl) + 1]):
+        if end > start:
+            np.testing.assert_allclose(bernstein @ segment, spline(start + u * (end - start)), atol=1e-9)
+        else:
+            # A repeated knot gives a single point, where the curve is.
+            np.testing.assert_allclose(segment, np.repeat(spline(start)[None], k, axis=0), atol=1e-9)
+
+
+def test_clamped_knots_with_a_repeated_interior_knot():
+    rng = np.random.default_rng(0)
+    assert_matches_scipy(rng.uniform(0, 800, (8, 2)), 4, np.array(CLAMPED, dtype=float))
+
+
+@pytest.mark.parametrize('k', [2, 3, 4, 5])
+def test_random_clamped_knots(k):
+    rng = np.random.default_rng(k)
+    for _ in range(50):
+        n = int(rng.integers(k + 1, 14))
+        assert_matches_scipy(rng.uniform(0, 800, (n, 2)), k, random_knots(rng, n, k))
+
+
+def test_repeated_knots_reach_projection_and_intersection():
+    rng = np.random.default_rng(1)
+    ctrl = rng.uniform(0, 800, (8, 2))
+    knots = np.array(CLAMPED, dtype=float)
+    projector = CurveProjector(ctrl, 4, knots)
+    t_values = np.linspace(0, 1, 41)
+    curve = scipy_interpolate.BSpline(knots, ctrl, 3)(t_values)
+    assert projector.project(curve)[2].max() < 1e-6
+    line = np.array([curve[0] - 1000 * (curve[-1] - curve[0]), curve[-1] + 1000 * (curve[-1] - curve[0])])
+    params, points = intersect(ctrl, 4, line, 2, knots_a=knots)
+    assert len(points) >= 2
+    np.testing.assert_allclose(scipy_interpolate.BSpline(knots, ctrl, 3)(params[:, 0]), points, atol=1e-6)
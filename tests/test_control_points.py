@@ -0,0 +1,37 @@
+import pytest
+
+from feleves_feladat.core.control_points import ControlPointStore
+from feleves_feladat.core.spatial_index import UniformGrid
+
+
+def test_removed_handles_are_rejected():
+    store = ControlPointStore([(50, 50), (200, 100), (300, 300)])
+    handle = store.handle_at(0)
+    store.remove(handle)
+    for call in (lambda: store.get(handle), lambda: store.set(handle, 50, 50), lambda: store.remove(handle)):
+        with pytest.raises(KeyError):
+            call()
+    assert store.array.tolist() == [[200, 100], [300, 300]]
+    assert store.find(50, 50) is None
+
+
+def test_unknown_handles_are_rejected():
+    store = ControlPointStore([(50, 50)])
+    for handle in (None, -1, 7):
+        with pytest.raises(KeyError):
+            store.get(handle)
+
+
+def test_set_moves_live_points():
+    store = ControlPointStore([(50, 50), (200, 100)])
+    handle = store.handle_at(1)
+    assert store.set(handle, 400, 400) == 1
+    assert store.find(400, 400) == handle
+    assert store.find(200, 100) is None
+
+
+def test_grid_move_ignores_unknown_keys():
+    grid = UniformGrid(20.0)
+    grid.move(3, 10, 10)
+    assert len(grid) == 0
+    assert grid.candidates(10, 10, 5) == []
@@ -0,0 +1,17 @@
+import numpy as np
+
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+from feleves_feladat.core.incremental import IncrementalBSpline
+
+
+def test_results_are_not_changed_by_later_updates():
+    calculator = BSplineCalculator()
+    curve = IncrementalBSpline(calculator)
+    ctrl = np.array([[100, 300], [200, 100], [300, 400], [400, 200], [500, 300], [600, 100]], dtype=float)
+    first = curve.evaluate(ctrl, 4)
+    expected = first.copy()
+    moved = ctrl.copy()
+    moved[2] += 50
+    second = curve.evaluate(moved, 4)
+    np.testing.assert_array_equal(first, expected)
+    np.testing.assert_allclose(second, calculator.compute_bspline(moved, 4, curve.num_points), atol=1e-9)
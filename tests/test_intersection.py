@@ -0,0 +1,38 @@
+import numpy as np
+
+from feleves_feladat.core.bspline_approximator import BSplineApproximator
+from feleves_feladat.core.bspline_calculator import BSplineCalculator
+from feleves_feladat.core.intersection import coincident, intersect
+
+
+def test_crossing_on_a_breakpoint():
+    # The polyline's middle vertex lies on the other line; with uniform
+    # knots it sits on a breakpoint of the k = 2 curve.
+    polyline = np.array([[0.0, -100.0], [100.0, 0.0], [200.0, -100.0]])
+    line = np.array([[0.0, 0.0], [200.0, 0.0]])
+    params, points = intersect(polyline, 2, line, 2)
+    assert len(points) == 1
+    np.testing.assert_allclose(points[0], [100.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(params[0], [0.5, 0.5], atol=1e-9)
+
+
+def test_crossings_lie_on_both_curves():
+    rng = np.random.default_rng(3)
+    ctrl_a, ctrl_b = rng.uniform(0, 800, (12, 2)), rng.uniform(0, 800, (9, 2))
+    calculator = BSplineCalculator()
+    params, points = intersect(ctrl_a, 4, ctrl_b, 3, calculator=calculator)
+    assert len(points) > 0
+    on_a = calculator.evaluate(ctrl_a, 4, params[:, 0], np.linspace(0, 1, 16))
+    on_b = calculator.evaluate(ctrl_b, 3, params[:, 1], np.linspace(0, 1, 12))
+    np.testing.assert_allclose(on_a, points, atol=1e-6)
+    np.testing.assert_allclose(on_b, points, atol=1e-6)
+
+
+def test_a_curve_does_not_cross_itself_or_its_refit():
+    rng = np.random.default_rng(6)
+    ctrl = rng.uniform(0, 800, (10, 2))
+    refit = BSplineApproximator(BSplineCalculator()).least_squares_approximation(ctrl, 4, 4, 10)[0]
+    assert coincident(ctrl, 4, refit, 4)
+    assert len(intersect(ctrl, 4, ctrl, 4)[1]) == 0
+    assert len(intersect(ctrl, 4, refit, 4)[1]) == 0
+    assert not coincident(ctrl, 4, ctrl, 3)
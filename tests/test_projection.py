@@ -0,0 +1,62 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+from feleves_feladat.core.projection import CurveProjector, derivative_product_weights
+
+scipy_spatial = pytest.importorskip('scipy.spatial')
+
+
+def dense_distances(projector, queries, count=100001):
+    # Every dense sample is a point of the curve, so the nearest one bounds
+    # the true distance from above.
+    t_values = np.linspace(projector.t_start, projector.t_end, count)
+    return scipy_spatial.cKDTree(projector.evaluate(t_values)[0]).query(queries)[0]
+
+
+@pytest.mark.parametrize('k', [2, 3, 4, 5, 6])
+@pytest.mark.parametrize('seed', range(6))
+def test_project_is_not_farther_than_dense_sampling(k, seed):
+    rng = np.random.default_rng(seed)
+    projector = CurveProjector(rng.uniform(0, 800, (32, 2)), k)
+    queries = rng.uniform(-100, 900, (500, 2))
+    t, points, distances = projector.project(queries)
+    assert np.all(distances <= dense_distances(projector, queries) + 1e-9)
+    np.testing.assert_allclose(np.linalg.norm(points - queries, axis=1), distances)
+    np.testing.assert_allclose(projector.evaluate(t)[0], points, atol=1e-9)
+
+
+def test_project_points_on_the_curve():
+    rng = np.random.default_rng(0)
+    projector = CurveProjector(rng.uniform(0, 800, (12, 2)), 4)
+    t_values = np.linspace(projector.t_start, projector.t_end, 101)
+    distances = projector.project(projector.evaluate(t_values)[0])[2]
+    assert distances.max() < 1e-9
+
+
+def test_span_polynomial_holds_on_its_closed_interval():
+    rng = np.random.default_rng(5)
+    projector = CurveProjector(rng.uniform(0, 800, (32, 2)), 2)
+    span = np.arange(len(projector.widths))
+    value, first, _ = projector.evaluate(projector.breakpoints[1:], span)
+    np.testing.assert_allclose(value, projector.segments[:, -1], atol=1e-9)
+    np.testing.assert_allclose(first * projector.widths[:, None], projector.segments[:, 1] - projector.segments[:, 0])
+
+
+def test_invalid_curve_projects_nothing():
+    t, points, distances = CurveProjector([[0, 0]], 3).project([[1, 1]])
+    assert len(t) == len(points) == len(distances) == 0
+
+
+@pytest.mark.parametrize('k', [2, 3, 4, 6])
+def test_derivative_product_weights(k):
+    # The Bernstein coefficients give (C(u) - q) . C'(u) of a Bezier piece.
+    rng = np.random.default_rng(k)
+    piece, q = rng.uniform(0, 100, (k, 2)), rng.uniform(0, 100, 2)
+    offsets, tangents = piece - q, (k - 1) * np.diff(piece, axis=0)
+    products = np.einsum('jx,lx->jl', offsets, tangents).ravel() @ derivative_product_weights(k)
+    u = np.linspace(0, 1, 11)
+    bernstein = lambda d: np.array([[comb(d, i) * x ** i * (1 - x) ** (d - i) for i in range(d + 1)] for x in u])
+    expected = np.einsum('ux,ux->u', bernstein(k - 1) @ offsets, bernstein(k - 2) @ tangents)
+    np.testing.assert_allclose(bernstein(2 * k - 3) @ products, expected, atol=1e-6)
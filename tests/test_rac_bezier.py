@@ -0,0 +1,22 @@
+import numpy as np
+
+from rac_bezier import FIXED_LEVELS, BezierCurve
+
+
+def test_drags_only_cache_the_fixed_levels():
+    curve = BezierCurve()
+    handle = curve._points.handles[1]
+    reference = curve.tessellate()
+    assert curve.basis_cache.stats()['entries'] == FIXED_LEVELS
+    for step in range(20):
+        curve._points.set(handle, 300 + 7 * step, 100 - 11 * step)
+        curve.tessellate()
+    assert curve.basis_cache.stats()['entries'] == FIXED_LEVELS
+    curve._points.set(handle, 300, 100)
+    for expected, actual in zip(reference, curve.tessellate()):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_curve_ends_on_the_end_points():
+    curve = BezierCurve()
+    np.testing.assert_allclose(curve.bezier([0.0, 1.0]), curve._points.array[[0, -1]])
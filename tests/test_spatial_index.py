@@ -0,0 +1,24 @@
+import numpy as np
+
+from feleves_feladat.core.spatial_index import SegmentBVH
+
+
+def test_update_refits_only_the_segments_next_to_moved_points():
+    rng = np.random.default_rng(0)
+    points = np.cumsum(rng.normal(0, 20, (200, 2)), axis=0)
+    bvh = SegmentBVH(points)
+    moved = points.copy()
+    moved[[0, 3, 150, 199]] += rng.normal(0, 50, (4, 2))
+    # Segments 0, 2, 3, 149, 150 and 198.
+    assert bvh.update(moved) == 6
+    rebuilt = SegmentBVH(moved)
+    np.testing.assert_array_equal(bvh.box_min, rebuilt.box_min)
+    np.testing.assert_array_equal(bvh.box_max, rebuilt.box_max)
+    for _ in range(50):
+        x, y = rng.uniform(-200, 200, 2)
+        assert bvh.nearest(x, y)[0] == rebuilt.nearest(x, y)[0]
+
+
+def test_update_without_moves_refits_nothing():
+    points = np.arange(10.0).reshape(5, 2)
+    assert SegmentBVH(points).update(points.copy()) == 0